@@ -23,12 +23,25 @@ update roadmap:
 -fix any bugs that arise from testing and usage post release 2.0
     
 -begin drafting the scoring system into the bot (will come after release 2.0)
+    -score drafts from the events results (/score_draft), still need to tune the point values
 '''
 
 #import draft
 from manager import draft
 #import excel
 from manager import excel
+#import robotevents handler (for request priorities)
+from manager import robotevents_handler
+#import the scoring system
+from manager import scoring
+#import the draft scheduler
+from manager.draft_scheduler import DraftScheduler
+#import the storage layer (where drafts are saved)
+from manager.storage import get_storage
+#import the outbox (batches up the messages drafts send)
+from manager.outbox import outbox
+#import the render pool (draws board images and writes excel files in worker processes)
+from manager.render_pool import render_pool, RenderQueueFull, RenderFailed
 
 #imports discord token from an encrypted .env file
 import os
@@ -39,10 +52,8 @@ load_dotenv()
 DS_TOKEN = os.getenv("DISCORD_TOKEN")
 RB_TOKEN = os.getenv("ROBOTEVENTS_TOKEN")
 
-#get the admin bypass ids
-ADMIN_BYPASS_IDS = os.getenv("ADMIN_BYPASS_IDS").split(",")
-for i in range(len(ADMIN_BYPASS_IDS)):
-    ADMIN_BYPASS_IDS[i] = int(ADMIN_BYPASS_IDS[i])
+#the admin bypass ids (read from the .env file when the bot starts, see main)
+ADMIN_BYPASS_IDS = []
 
 #discord imports
 import discord
@@ -50,10 +61,9 @@ from discord.ext import commands
 
 #import other neccessary modules
 import time
-import threading
 import asyncio
 import csv
-import tempfile
+import io
 
 #setup intents (just message_content isn't needed for slash commands, but safe to keep)
 intents = discord.Intents.default()
@@ -63,8 +73,18 @@ intents.message_content = True
 intents.guilds = True
 intents.members = True
 
+#the bot, with a hook to clean up after itself when it shuts down
+class DraftBot(commands.Bot):
+    #called when the bot is shutting down (ctrl+c or bot.close())
+    async def close(self):
+        #close the shared robotevents session so it isnt left open
+        await robotevents_handler.close_session()
+        #and stop the render workers
+        render_pool.shutdown()
+        await super().close()
+
 #assigns "!" as the command prefix for all commands
-bot = commands.Bot(command_prefix="!", intents=discord.Intents.all())
+bot = DraftBot(command_prefix="!", intents=discord.Intents.all())
 
 """
 DISCORD PAGINATION
@@ -125,8 +145,13 @@ class Paginator(discord.ui.View):
 """
 HELPER FUNCTIONS
     -is_admin (checks of the user is an admin)
+    -get_channel_draft (gets the draft bound to the channel a command was sent in)
     -validation_check(checks if the user is in the draft and in the correct channel)
     -run_draft (runs the main draft for picking teams)
+    -setup_excel (creates the excel manager for a draft)
+    -bind_draft (binds a draft to its channel and starts running it)
+    -channel_is_free (checks a channel isnt already running a different draft)
+    -describe_draft (one line summary of where a running draft is at)
 """
 
 #function to return true if the user is an administator, false if not
@@ -153,6 +178,19 @@ def is_admin(interaction: discord.Interaction) -> bool:
         return False
     return False
 
+#function to get the draft that is bound to the channel a command was sent in
+def get_channel_draft(interaction: discord.Interaction):
+    '''
+    helper function that looks up which draft (if any) is running in the interactions channel
+
+    :param interaction: the raw discord interaction object to get the channel from
+    :type interaction: discord.Interaction
+    :return: the name of the draft bound to the channel, or None
+    :rtype: str
+    '''
+    channel = getattr(interaction, "channel", None)
+    return draft_channels.get(getattr(channel, "id", None))
+
 #function to validate if the user is allowed to run the 
 def validation_check(interaction: discord.Interaction) -> bool:
     '''
@@ -163,26 +201,24 @@ def validation_check(interaction: discord.Interaction) -> bool:
     :return: True if the user is communicating in the correct draft channel and is an active participant, false Otherwise
     :rtype: bool
     '''
-    for draft in drafts:
-        if drafts[draft].channel == interaction.channel:
-            #validate and make sure person is in the draft
-            if drafts[draft].validate_participant(interaction.user.id) == True:
-                #code here
-                return True, draft
+    draft = get_channel_draft(interaction)
+    if draft is not None:
+        #validate and make sure person is in the draft
+        if drafts[draft].validate_participant(interaction.user.id) == True:
+            #code here
+            return True, draft
     return False, None
 
 #function to run the draft
-def run_draft(draft_instance,bot):
+async def run_draft(draft_instance, start_position = 0):
     '''
-    function that runs the main draft for picking teams
+    function that runs the main draft for picking teams, as a task on the bots event loop
 
     :param draft_instance: the class object that houses all of the data for the draft
     :type draft_instance: Class Object
-    :param bot: the bot object
-    :type bot: idk
+    :param start_position: the real position to start from (used to resume a draft after a restart)
+    :type start_position: int
     '''
-    #get the draft data
-    drafters = draft_instance.draft_data
     #helper function to get the snake position in the draft and the round
     def get_snake_position(real_position):
         """
@@ -203,89 +239,161 @@ def run_draft(draft_instance,bot):
             position_in_round = draft_instance.total_participants - 1 - index_in_round
         #return both values
         return round_number+1, position_in_round
-    #set now_up to none
-    now_up = None
-    #go through each round (real position is where the draft currently is based on total participants and rounds, and not on snake position)
-    for real_position in range(draft_instance.total_participants*draft_instance.round_limit):
-        draft_instance.real_position = real_position
-        #use the helper function to get the current round and snake position for the main player
-        round, draft_instance.current_position = get_snake_position(real_position)
-        for drafter in drafters:
+    #hold on to the channel so it can be released however the draft ends
+    channel = draft_instance.channel
+    #snapshot the draft every so often, even while nobody is picking
+    draft_instance.start_snapshot_timer()
+    try:
+        #go through each round (real position is where the draft currently is based on total participants and rounds, and not on snake position)
+        for real_position in range(start_position, draft_instance.total_participants*draft_instance.round_limit):
+            #use the helper function to get the current round and snake position for the main player
+            round, position = get_snake_position(real_position)
+            draft_instance.advance_to(real_position, position)
             #identify the drafter who is in this position
-            if drafter["position"] == draft_instance.current_position:
-                #debouncer
-                debounce = True
-                warningDebounce = True
-                #set the time memory
-                draft_instance.time_memory = time.time()
-                #check and see if their queue can be processed
-                while not draft_instance.process_pick(draft_instance.current_position,round):
-                    #check if skip has been requested
-                    if draft_instance.skip_check:
-                        draft_instance.skip_check = False
-                        print(f"[BOT] [FROM {draft_instance.draft_name}] Turn Skipped.")
-                        break
-                    #check and see if the time limit has been exceeded
-                    if draft_instance.time_limit_min > 0 and now_up != None:
-                        current_time = time.time()
-                        #get the time remaining in minutes
-                        time_remaining = ((draft_instance.time_memory+(draft_instance.time_limit_min*60))-current_time)/60
-                        #warn the user if they pass the warning time threshold in minutes
-                        if warningDebounce and (time_remaining <= draft_instance.timer_warning):
-                                print(f"[BOT] Sending warning to {now_up} before they are skipped.")
-                                warningDebounce = False
-                                if getattr(draft_instance, "channel", None) is not None:
-                                    asyncio.run_coroutine_threadsafe(
-                                        draft_instance.channel.send(f"<@{now_up}> has {draft_instance.timer_warning} minutes before they are skipped."),
-                                        draft_instance.bot.loop
-                                    )
-                        if time_remaining <= 0:
-                            if draft_instance.is_in_downtime():
-                                #in downtime, do not skip
-                                pass
-                            else:
-                                print(f"[BOT] [FROM {draft_instance.draft_name}] Time Limit Exceeded. Skipping Turn.")
-                                #random pick for the drafter
-                                draft_instance.skip_check = True
-                    #ping who is up, who is on deck, and who is in the2 hole (only once per turn)
-                    if debounce:
-                        debounce = False  
-                        #get the ids of the three players
-                        now_up = drafter["id"]
-                        discard, drafter_pos = get_snake_position(real_position+1)
-                        for next_drafter in drafters:
-                            if next_drafter["position"] == drafter_pos:
-                                on_deck = next_drafter["id"]
-                        discard, drafter_pos = get_snake_position(real_position+2)
-                        for next_drafter in drafters:
-                            if next_drafter["position"] == drafter_pos:
-                                in_hole = next_drafter["id"]
-                        msg = f"UP NOW: <@{now_up}>\nON DECK: <@{on_deck}>\nIN THE HOLE: <@{in_hole}>"
-                        #schedule the send on the bot event loop from this worker thread
-                        if getattr(draft_instance, "channel", None) is not None:
-                            asyncio.run_coroutine_threadsafe(
-                                draft_instance.channel.send(msg),
-                                draft_instance.bot.loop
-                            )
-                    time.sleep(2)
-                #tell people what each person has picked
-                if getattr(draft_instance, "channel", None) is not None:
-                    asyncio.run_coroutine_threadsafe(
-                        draft_instance.channel.send(f"<@{drafter['id']}> has picked {(draft_instance.get_picks(drafter['id']))[round-1]}"),
-                        draft_instance.bot.loop
-                    )
-                    time.sleep(0.2)
-    #print that the draft has finished
-    asyncio.run_coroutine_threadsafe(
-        draft_instance.channel.send("Draft has Finished."),
-        draft_instance.bot.loop
-    )
-    #unbound the channel and reopen it for future drafts
-    draft_instance.channel = None
+            drafter = draft_instance.get_player_at(draft_instance.current_position)
+            if drafter is None:
+                continue
+            #already picked for this round (happens when resuming after a restart)
+            if drafter.rounds[round-1] is not None:
+                continue
+            #debouncer
+            debounce = True
+            #set the time memory
+            draft_instance.time_memory = time.time()
+            #clear any wake ups left over from the last turn (they get re-checked below anyway)
+            draft_instance.turn_event.clear()
+            #check and see if their queue can be processed
+            while not draft_instance.process_pick(draft_instance.current_position,round):
+                #check if skip has been requested
+                if draft_instance.skip_check:
+                    draft_instance.skip_check = False
+                    print(f"[BOT] [FROM {draft_instance.draft_name}] Turn Skipped.")
+                    break
+                #ping who is up, who is on deck, and who is in the hole (only once per turn)
+                if debounce:
+                    debounce = False  
+                    #get the ids of the three players
+                    now_up = drafter["id"]
+                    discard, drafter_pos = get_snake_position(real_position+1)
+                    on_deck = draft_instance.get_player_at(drafter_pos)["id"]
+                    discard, drafter_pos = get_snake_position(real_position+2)
+                    in_hole = draft_instance.get_player_at(drafter_pos)["id"]
+                    msg = f"UP NOW: <@{now_up}>\nON DECK: <@{on_deck}>\nIN THE HOLE: <@{in_hole}>"
+                    if getattr(draft_instance, "channel", None) is not None:
+                        outbox.send(draft_instance.channel, msg)
+                    #put them on the clock (the timer service wakes us for the warning and the skip)
+                    draft_instance.start_turn_timers()
+                #warn the user if the warning timer went off
+                if draft_instance.warning_due:
+                    draft_instance.warning_due = False
+                    draft_instance.warning_sent = True
+                    print(f"[BOT] Sending warning to {now_up} before they are skipped.")
+                    if getattr(draft_instance, "channel", None) is not None:
+                        outbox.send(draft_instance.channel, f"<@{now_up}> has {draft_instance.timer_warning} minutes before they are skipped.")
+                #sleep until a pick, skip, warning or timer change wakes us up
+                await draft_instance.wait_for_wake()
+            #take them off the clock
+            draft_instance.end_turn_timers()
+            #tell people what each person has picked (back to back picks get sent together)
+            if getattr(draft_instance, "channel", None) is not None:
+                outbox.send(draft_instance.channel, f"<@{drafter['id']}> has picked {(draft_instance.get_picks(drafter['id']))[round-1]}")
+        #print that the draft has finished
+        draft_instance.mark_finished()
+        outbox.send(channel, "Draft has Finished.")
+        await outbox.drain(channel)
+    finally:
+        #unbind the channel and reopen it for future drafts (even if the draft crashed or was cancelled)
+        draft_instance.end_turn_timers()
+        draft_instance.stop_snapshot_timer()
+        outbox.forget(channel)
+        if draft_channels.get(channel.id) == draft_instance.draft_name:
+            del draft_channels[channel.id]
+        draft_instance.channel = None
+
+#function to create the excel manager for a draft
+def setup_excel(draft_instance):
+    '''
+    helper function that creates the excel manager for a draft once its order is set
+    (the sheet itself is built in the render pool when it gets exported)
+
+    :param draft_instance: the class object that houses all of the data for the draft
+    :type draft_instance: Class Object
+    '''
+    draft_instance.excel_manager = excel.ExcelManager(f"{draft_instance.draft_name}_draft", draft_instance.draft_data,
+                                                      draft_instance.round_limit, draft_instance.total_participants)
+
+#function to bind a draft to its channel and start it
+def bind_draft(draft_instance, channel, start_position = 0):
+    '''
+    helper function that routes a channel to a draft and hands the draft to the scheduler
+
+    :param draft_instance: the class object that houses all of the data for the draft
+    :type draft_instance: Class Object
+    :param channel: the discord text channel the draft runs in
+    :type channel: discord.TextChannel
+    :param start_position: the real position to start from
+    :type start_position: int
+    :return: True if the draft was bound, False if another draft already has the channel
+    :rtype: bool
+    '''
+    #a channel can only run one draft at a time
+    if not channel_is_free(channel, draft_instance.draft_name):
+        print(f"[BOT] [FROM {draft_instance.draft_name.upper()}] Channel {channel.id} Already Has a Draft Running.")
+        return False
+    draft_instance.channel = channel
+    draft_channels[channel.id] = draft_instance.draft_name
+    draft_scheduler.start(draft_instance, run_draft, start_position)
+    return True
+
+#function to check if a channel is free for a draft to run in
+def channel_is_free(channel, draft_name):
+    '''
+    helper function that checks a channel isnt already bound to a different draft
+
+    :param channel: the discord text channel to check
+    :type channel: discord.TextChannel
+    :param draft_name: the name of the draft that wants the channel
+    :type draft_name: str
+    :return: True if the channel is unbound or already bound to this draft, False otherwise
+    :rtype: bool
+    '''
+    return draft_channels.get(channel.id, draft_name) == draft_name
+
+#function to describe where a running draft is at (used by the admin view)
+def describe_draft(draft_instance):
+    '''
+    helper function that sums up the state of a running draft in one line
+
+    :param draft_instance: the class object that houses all of the data for the draft
+    :type draft_instance: Class Object
+    :return: a short description of the draft
+    :rtype: str
+    '''
+    total_picks = draft_instance.total_participants * draft_instance.round_limit
+    drafter = draft_instance.get_player_at(draft_instance.current_position)
+    now_up = f"<@{drafter['id']}>" if drafter is not None else "nobody"
+    channel = getattr(draft_instance.channel, "mention", "no channel")
+    line = (f"**{draft_instance.draft_name}** in {channel}: round {draft_instance.get_current_round()}/{draft_instance.round_limit}, "
+            f"pick {draft_instance.real_position + 1}/{total_picks}, up now {now_up}")
+    time_remaining = draft_instance.get_time_remaining()
+    if time_remaining is not None:
+        line += f", {int(time_remaining // 60)}m {int(time_remaining % 60)}s left"
+    if draft_instance.is_in_downtime():
+        line += " (downtime)"
+    return line
 
 #dictionary to store drafts
 drafts = {} # key: draft_name, value: draft instance
 
+#dictionary to route commands to drafts
+draft_channels = {} # key: channel id, value: draft_name (only drafts that are running)
+
+#runs every active draft as a task on the bots event loop
+draft_scheduler = DraftScheduler()
+
+#set once the drafts have been loaded, on_ready runs again after every reconnect and they must only be loaded once
+drafts_restored = False
+
 """
 BOT EVENTS
     -on_ready (basically the bots constructor)
@@ -300,8 +408,14 @@ async def on_ready():
     takes no parameters and returns nothing, instead declares and initializes various variables and data
     from saved files and such
     '''
+    global drafts_restored
     #tells the console the bot is logged in
     print(f'[BOT] Logged in as {bot.user}')
+    #a reconnect, everything is already loaded and running (reloading would swap out drafts that are mid pick)
+    if drafts_restored:
+        print("[BOT] Reconnected, Drafts Already Loaded.")
+        return
+    drafts_restored = True
     #registering commands with discord
     try:
         synced = await bot.tree.sync()
@@ -312,54 +426,71 @@ async def on_ready():
     excel.wipe_excel_folder()
     print("[BOT] Excels File Refreshed.")
     #load the drafts from saved data
-    print("[BOT] Loading Drafts from Save File...")
+    print("[BOT] Loading Drafts from Storage...")
+    needs_teams = []
     try:
-        with open ("drafts.csv", "r", newline='',encoding="utf-8") as draft_savefile:
-            #helper function that turns "" into None
-            def value_check(value):
-                return None if value == "" else value
-            #declare the reader and go through each line
-            reader = csv.reader(draft_savefile)
-            for row in reader:
-                #get values from the csv
-                draft_name = row[0]
-                draft_rounds = int(value_check(row[2]))
-                draft_limit = value_check(row[1])
-                draft_sku = value_check(row[6])
-                draft_seed = int(value_check(row[7]))
-                current_position = int(value_check(row[8]))
-                #creates the draft object
-                new_draft = draft.Draft(draft_name, draft_rounds, draft_limit, draft_sku, bot, draft_seed, current_position)
-                drafts[draft_name] = new_draft
-                #gets the announcement id
-                try:
-                    new_draft.announcement_id = int(value_check(row[3]))
-                except Exception:
-                    new_draft.announcement_id = None
-                new_draft.emoji = value_check(row[4])
-                # restore announce channel id -> channel object if possible
-                announce_id = value_check(row[5])
-                if announce_id is None:
-                    new_draft.announce_channel = None
-                else:
+        #bring over the old csv save file if there is one
+        storage = get_storage()
+        storage.migrate_csv()
+        for saved in storage.load_drafts():
+            draft_name = saved["name"]
+            #creates the draft object and fills it back in
+            new_draft = draft.Draft(draft_name, saved["round_limit"], saved["people_limit"], saved["sku"], bot,
+                                    saved["seed"], saved["current_position"] or 0)
+            drafts[draft_name] = new_draft
+            new_draft.restore(saved)
+            #the snapshot (if there is one) can be older than the saved rows, since rows are written on every event
+            #and snapshots only every so often, that is fine because the journal holds every event since the snapshot
+            #(it is only ever cleared right after a snapshot is written) and replay_journal below reapplies them
+            new_draft.load_snapshot()
+            if not new_draft.teams:
+                needs_teams.append(draft_name)
+            # restore announce channel id -> channel object if possible
+            if new_draft.announce_channel is not None:
+                cid = new_draft.announce_channel
+                # try cache first, fall back to API fetch
+                channel_obj = bot.get_channel(cid)
+                if channel_obj is None:
                     try:
-                        cid = int(announce_id)
-                        # try cache first, fall back to API fetch
-                        channel_obj = bot.get_channel(cid)
-                        if channel_obj is None:
-                            try:
-                                channel_obj = await bot.fetch_channel(cid)
-                            except Exception:
-                                channel_obj = None
-                        new_draft.announce_channel = channel_obj
+                        channel_obj = await bot.fetch_channel(cid)
                     except Exception:
-                        new_draft.announce_channel = None
-                print(f"[BOT] [FROM {draft_name.upper()}] Draft Loaded Successfully")
-    except FileNotFoundError:
-        print("[BOT] No Drafts to Load.")
+                        channel_obj = None
+                new_draft.announce_channel = channel_obj
+            print(f"[BOT] [FROM {draft_name.upper()}] Draft Loaded Successfully")
+        if not drafts:
+            print("[BOT] No Drafts to Load.")
     except Exception as e:
-        print(f"[BOT] Error Loading Save File, assuming no drafts to load.")
+        print(f"[BOT] Error Loading Drafts, assuming no drafts to load.")
         print(f"[BOT] Error Details: {e}")
+    #load the teams concurrently for any draft that didnt have them saved
+    #(restores go in the background lane so an admin creating a draft isnt stuck behind them)
+    results = await asyncio.gather(*(drafts[name].load_teams(robotevents_handler.PRIORITY_BACKGROUND) for name in needs_teams),
+                                   return_exceptions=True)
+    for name, result in zip(needs_teams, results):
+        if isinstance(result, Exception):
+            print(f"[BOT] [FROM {name.upper()}] Error Loading Teams: {result}")
+    #rebuild every draft from its journal and pick back up where any running draft left off
+    for name in list(drafts):
+        restored = drafts[name]
+        try:
+            restored.replay_journal()
+        except Exception as e:
+            print(f"[BOT] [FROM {name.upper()}] Error Replaying Journal: {e}")
+            continue
+        #any started draft gets its excel manager back (finished ones can still be exported and scored)
+        if restored.started:
+            setup_excel(restored)
+        if not restored.started or restored.finished or restored.channel_id is None:
+            continue
+        channel_obj = bot.get_channel(restored.channel_id)
+        if channel_obj is None:
+            try:
+                channel_obj = await bot.fetch_channel(restored.channel_id)
+            except Exception:
+                print(f"[BOT] [FROM {name.upper()}] Draft Channel is Gone, Can't Resume.")
+                continue
+        if bind_draft(restored, channel_obj, restored.real_position):
+            print(f"[BOT] [FROM {name.upper()}] Draft Resumed at Pick {restored.real_position + 1}.")
 
 """
 MISC AND TEST COMMANDS
@@ -378,9 +509,13 @@ ADMIN COMMANDS
     -announce_draft (announces the draft and opens it for people to enter)
     -start_draft (starts the draft for everyone to star/get picking)
     -get_csv_file (returns a csv file for entire draft)
+    -get_excel_file (returns the excel sheet for the entire draft)
     -skip_turn (skips the current persons turn)
     -force_pick (forces a pick for the current user)
     -add_team ()
+    -refresh_event_cache (re-downloads the event and teams for a draft, skipping the cache)
+    -active_drafts (shows every running draft and where it is at)
+    -score_draft (scores everyones picks from the events results and shows the standings)
 """
 
 #command that creates the draft
@@ -416,11 +551,24 @@ async def create_draft(interaction: discord.Interaction,
     if draft_rounds < 1:
         print(f"[BOT] [FROM {draft_object}] Invalid Amount of Rounds")
         return
-    #creates the draft object
+    #acknowledge the interaction immediately, loading the teams can take a few seconds
+    await interaction.response.defer()
+    #creates the draft object (registered right away so a second create cant sneak in while loading)
     new_draft = draft.Draft(draft_object, draft_rounds, draft_limit, draft_sku, bot)
     drafts[draft_object] = new_draft
     #save the sku to the draft
     new_draft.draft_sku = draft_sku
+    #load the teams without blocking the rest of the bot
+    try:
+        await new_draft.load_teams()
+    except Exception as e:
+        drafts.pop(draft_object, None)
+        print(f"[BOT] [FROM {draft_object}] Error Loading Teams: {e}")
+        await interaction.followup.send(f"Could not load teams for {draft_sku}.", ephemeral=True)
+        return
+    #start the journal fresh (in case an old draft with the same name left one behind)
+    new_draft.journal.truncate()
+    new_draft.journal.remove_snapshot()
     #send the draft creation confirmation
     msg = (
         f'Draft "{draft_object}" created successfully!\n'
@@ -429,7 +577,7 @@ async def create_draft(interaction: discord.Interaction,
         f'Event SKU: {draft_sku}\n'
         f'Limit: {draft_limit}'
     )
-    await interaction.response.send_message(msg)
+    await interaction.followup.send(msg)
     #save the draft as is
     new_draft.save_draft()
 
@@ -489,7 +637,7 @@ async def start_draft(interaction: discord.Interaction,
     timer_warning: int = 5
     ):
     '''
-    function that starts the draft instance, and creates a thread for the draft function to run in
+    function that starts the draft instance, and hands it to the draft scheduler to run
 
     :param draft_object: the name you want to assign to the draft
     :type draft_object: str
@@ -505,6 +653,14 @@ async def start_draft(interaction: discord.Interaction,
     if not is_admin(interaction):
         await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
         return
+    #dont start a draft that is already running
+    if draft_scheduler.is_running(draft_object):
+        await interaction.followup.send("Draft is already running.", ephemeral=True)
+        return
+    #or in a channel that already has a draft in it
+    if not channel_is_free(draft_channel, draft_object):
+        await interaction.followup.send("That channel already has a draft running in it.", ephemeral=True)
+        return
     #get the emoji and announcement from the announcement message
     aid, emoji, channel = drafts[draft_object].get_announcement_id()
     announcment = await channel.fetch_message(aid)
@@ -519,20 +675,15 @@ async def start_draft(interaction: discord.Interaction,
     #set the draft order
     drafts[draft_object].set_draft_order()
     #create the draft excel file
-    drafts[draft_object].excel_manager = excel.ExcelManager(f"{drafts[draft_object].draft_name}_draft", drafts[draft_object].draft_data,
-                                                            drafts[draft_object].round_limit, drafts[draft_object].total_participants)
-    drafts[draft_object].excel_manager.create_draft_sheet()
+    setup_excel(drafts[draft_object])
     #set the time limit
-    drafts[draft_object].time_limit_min = min_time_limit
-    drafts[draft_object].timer_warning = timer_warning
+    drafts[draft_object].set_timing(min_time_limit, timer_warning)
     #send an initial message to the channel
     try:
         await draft_channel.send(f"The {drafts[draft_object].draft_name} draft is starting soon!")
-        #set the drafts communcations channel to the proper one
-        drafts[draft_object].channel = draft_channel
-        #start the thread
-        thread_instance = threading.Thread(target=run_draft, args=(drafts[draft_object],bot), daemon=True)
-        thread_instance.start()
+        #set the drafts communcations channel to the proper one and start the draft task
+        drafts[draft_object].mark_started(draft_channel)
+        bind_draft(drafts[draft_object], draft_channel)
     except discord.Forbidden:
         await interaction.followup.send(f"Bot does not have access to that channel.",ephemeral=True)
         return
@@ -557,18 +708,16 @@ async def skip_turn(interaction: discord.Interaction):
         #acknowledge the interaction immediately to avoid token expiry while we do network/IO work
         await interaction.response.defer()
         #validate what channel this draft is affilliated with, and set the skip check to true
-        for draft in drafts:
-            if drafts[draft].channel == interaction.channel:
-                #get the current position, and the drafter id assigned
-                current_position = drafts[draft].current_position
-                for drafter in drafts[draft].draft_data:
-                    if drafter["position"] == current_position:
-                        drafter_id = drafter["id"]
-                #update the skip check
-                drafts[draft].skip_check = True
-                print(f"[BOT] [FROM {drafts[draft].draft_name.upper()}] Requesting Turn Skip.")
-                await interaction.followup.send(f"Skipping <@{drafter_id}>.")
-                return
+        draft = get_channel_draft(interaction)
+        if draft is not None:
+            #get the current position, and the drafter id assigned
+            current_position = drafts[draft].current_position
+            drafter_id = drafts[draft].get_player_at(current_position)["id"]
+            #update the skip check (and wake the draft up so it happens right away)
+            drafts[draft].request_skip()
+            print(f"[BOT] [FROM {drafts[draft].draft_name.upper()}] Requesting Turn Skip.")
+            await interaction.followup.send(f"Skipping <@{drafter_id}>.")
+            return
     #if theres a channel restriction
     except discord.Forbidden:
         await interaction.followup.send(f"Bot does not have access to that channel.",ephemeral=True)
@@ -603,9 +752,9 @@ async def get_csv_file(interaction: discord.Interaction,
         drafters = getattr(draft_instance, "draft_data", []) or []
         sorted_drafters = sorted(drafters, key=lambda x: x.get("position", float("inf")))
 
-        #write CSV to a temporary file
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".csv", mode="w", newline="", encoding="utf-8")
-        writer = csv.writer(tmp)
+        #write the CSV in memory
+        buffer = io.StringIO(newline="")
+        writer = csv.writer(buffer)
         #get the template row
 
         writer.writerow(["position", "id", "name", "picks"])
@@ -626,13 +775,10 @@ async def get_csv_file(interaction: discord.Interaction,
             row.extend(picks)
             writer.writerow(row)
 
-        tmp.flush()
-        tmp.close()
-
-        # Send the file and clean up
-        with open(tmp.name, "rb") as fp:
-            await interaction.followup.send(file=discord.File(fp, filename=f"{draft_object}_picks.csv"))
-        os.remove(tmp.name)
+        # Send the file straight from memory
+        csv_data = buffer.getvalue().encode("utf-8")
+        excel.save_debug_copy(f"{draft_object}_picks.csv", csv_data)
+        await interaction.followup.send(file=discord.File(io.BytesIO(csv_data), filename=f"{draft_object}_picks.csv"))
         #send the emoji in that channel
         print(f"[BOT] [FROM {drafts[draft_object].draft_name.upper()}] CSV File Sent.")
         return
@@ -641,6 +787,45 @@ async def get_csv_file(interaction: discord.Interaction,
         await interaction.followup.send(f"Bot does not have access to that channel.",ephemeral=True)
         return
 
+@bot.tree.command(name="get_excel_file", description="Returns the excel sheet for the draft")
+async def get_excel_file(interaction: discord.Interaction,
+    draft_object: str,
+    ):
+    '''
+    function that returns the excel sheet of the draft from a draft object (the sheet is only written when this is asked for)
+
+    :param draft_object: the name of the requested draft
+    :type draft_object: str
+    '''
+    # permission check
+    if not is_admin(interaction):
+        await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
+        return
+    try:
+        #acknowledge the interaction immediately to avoid token expiry while we do network/IO work
+        await interaction.response.defer()
+        draft_instance = drafts.get(draft_object)
+        if not draft_instance or draft_instance.excel_manager is None:
+            await interaction.followup.send("Draft does not exist or has not started.", ephemeral=True)
+            return
+        #write the sheet out (in a worker process) and send it
+        try:
+            excel_data = await render_pool.export_workbook(draft_instance)
+        except RenderQueueFull:
+            await interaction.followup.send("The bot is busy right now, try again in a moment.", ephemeral=True)
+            return
+        except RenderFailed as e:
+            print(f"[BOT] [FROM {draft_instance.draft_name.upper()}] Error Writing Excel File: {e}")
+            await interaction.followup.send("Something went wrong writing the excel file, try again in a moment.", ephemeral=True)
+            return
+        await interaction.followup.send(file=discord.File(io.BytesIO(excel_data), filename=f"{draft_object}_draft.xlsx"))
+        print(f"[BOT] [FROM {draft_instance.draft_name.upper()}] Excel File Sent.")
+        return
+    #if theres a channel restriction
+    except discord.Forbidden:
+        await interaction.followup.send(f"Bot does not have access to that channel.",ephemeral=True)
+        return
+
 #function to force a pick upon a drafter
 @bot.tree.command(name="force_pick", description="Force a pick for a drafter from a draft object")
 async def force_pick(interaction: discord.Interaction,
@@ -665,30 +850,30 @@ async def force_pick(interaction: discord.Interaction,
         await interaction.followup.send("You do not have permission to use this command.", ephemeral=True)
         return
     #check what channel they are in and get the discord user
-    for draft in drafts:
-        if drafts[draft].channel == interaction.channel:
-            #this is the draft, validate the participant
-            if drafts[draft].validate_participant(target.id) == True:
-                #if the team is "random", pick a random team
-                if pick == "random":
-                    pick = drafts[draft].pick_random(target.id)
-                    if not pick:
-                        await interaction.followup.send(f"No Available Teams to Pick.",ephemeral=True)
-                        return
-                #if rounds is none, just add their pick to the queue
-                if (round == None) or (round == drafts[draft].current_round):
-                    if drafts[draft].pick_one(target.id,pick):
-                        await interaction.followup.send(f"{pick} Chosen for <@{target.id}>",ephemeral=True)
-                    else:
-                        await interaction.followup.send(f"{pick} Does Not Exist.",ephemeral=True)
+    draft = get_channel_draft(interaction)
+    if draft is not None:
+        #this is the draft, validate the participant
+        if drafts[draft].validate_participant(target.id) == True:
+            #if the team is "random", pick a random team
+            if pick == "random":
+                pick = drafts[draft].pick_random(target.id)
+                if not pick:
+                    await interaction.followup.send(f"No Available Teams to Pick.",ephemeral=True)
                     return
+            #if rounds is none, just add their pick to the queue
+            if (round == None) or (round == drafts[draft].current_round):
+                if drafts[draft].pick_one(target.id,pick):
+                    await interaction.followup.send(f"{pick} Chosen for <@{target.id}>",ephemeral=True)
                 else:
-                    #will add this later
-                    await interaction.followup.send(f"Command Not Implemented.",ephemeral=True)
-                    return
-            #if the target isnt a member of the draft
-            await interaction.followup.send(f"Target is not a member of this draft.",ephemeral=True)
-            return
+                    await interaction.followup.send(f"{pick} Does Not Exist.",ephemeral=True)
+                return
+            else:
+                #will add this later
+                await interaction.followup.send(f"Command Not Implemented.",ephemeral=True)
+                return
+        #if the target isnt a member of the draft
+        await interaction.followup.send(f"Target is not a member of this draft.",ephemeral=True)
+        return
     #if there is no draft to affiliate with
     await interaction.followup.send(f"Channel is not affiliated with a draft.",ephemeral=True)
     return
@@ -711,13 +896,13 @@ async def add_team(interaction: discord.Interaction,
         await interaction.followup.send("You do not have permission to use this command.", ephemeral=True)
         return
     #check what channel they are in and get the discord user
-    for draft in drafts:
-        if drafts[draft].channel == interaction.channel:
-            if drafts[draft].add_team(team):
-                await interaction.followup.send(f"{team} added to draft.",ephemeral=True)
-            else:
-                await interaction.followup.send("Team already exists.",ephemeral=True)
-            return
+    draft = get_channel_draft(interaction)
+    if draft is not None:
+        if drafts[draft].add_team(team):
+            await interaction.followup.send(f"{team} added to draft.",ephemeral=True)
+        else:
+            await interaction.followup.send("Team already exists.",ephemeral=True)
+        return
     #if there is no draft to affiliate with
     await interaction.followup.send(f"Channel is not affiliated with a draft.",ephemeral=True)
     return
@@ -740,17 +925,114 @@ async def remove_team(interaction: discord.Interaction,
         await interaction.followup.send("You do not have permission to use this command.",ephemeral=True)
         return
     #check what channel they are in and get the discord user
-    for draft in drafts:
-        if drafts[draft].channel == interaction.channel:
-            if drafts[draft].remove_team(team):
-                await interaction.followup.send(f"{team} removed from draft.",ephemeral=True)
-            else:
-                await interaction.followup.send("Error while removing team.",ephemeral=True)
-            return
+    draft = get_channel_draft(interaction)
+    if draft is not None:
+        if drafts[draft].remove_team(team):
+            await interaction.followup.send(f"{team} removed from draft.",ephemeral=True)
+        else:
+            await interaction.followup.send("Error while removing team.",ephemeral=True)
+        return
     #if there is no draft to affiliate with
     await interaction.followup.send(f"Channel is not affiliated with a draft.",ephemeral=True)
     return
 
+#command to see every running draft
+@bot.tree.command(name="active_drafts", description="Shows every draft that is currently running")
+async def active_drafts(interaction: discord.Interaction):
+    '''
+    function that shows the admin every running draft and where it is at
+
+    takes no parameters and returns nothing
+    '''
+    # permission check
+    if not is_admin(interaction):
+        await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
+        return
+    running = draft_scheduler.active_drafts()
+    if not running:
+        await interaction.response.send_message("No drafts are running.", ephemeral=True)
+        return
+    lines = [describe_draft(draft_instance) for draft_instance in running]
+    await interaction.response.send_message(f"**{len(running)} Active Draft(s):**\n" + "\n".join(lines), ephemeral=True)
+
+#function to refresh the cached robotevents data for a draft
+@bot.tree.command(name="refresh_event_cache", description="Re-downloads the event and team list for a draft")
+async def refresh_event_cache(interaction: discord.Interaction,
+    draft_object: str
+    ):
+    '''
+    function that skips the robotevents cache and pulls the event and team list again
+
+    :param draft_object: the name of the draft to refresh
+    :type draft_object: str
+    '''
+    #defer the response
+    await interaction.response.defer()
+    #permission check
+    if not is_admin(interaction):
+        await interaction.followup.send("You do not have permission to use this command.",ephemeral=True)
+        return
+    draft_instance = drafts.get(draft_object)
+    if not draft_instance:
+        await interaction.followup.send("Draft does not exist.", ephemeral=True)
+        return
+    #refresh the cache (the team list is only swapped if picking hasnt started)
+    if await draft_instance.refresh_teams():
+        await interaction.followup.send(f"Event cache refreshed, {len(draft_instance.teams)} teams loaded.",ephemeral=True)
+    else:
+        await interaction.followup.send(f"Event cache refreshed, draft has already started so its team list was kept.",ephemeral=True)
+    print(f"[BOT] [FROM {draft_instance.draft_name.upper()}] Event Cache Refreshed.")
+
+#function to score a draft once its event is over
+@bot.tree.command(name="score_draft", description="Scores the draft from the events results and shows the standings")
+async def score_draft(interaction: discord.Interaction,
+    draft_object: str
+    ):
+    '''
+    function that pulls the events results from robotevents, scores everyones picks, and sends the standings
+
+    :param draft_object: the name of the draft to score
+    :type draft_object: str
+    '''
+    #defer the response
+    await interaction.response.defer()
+    #permission check
+    if not is_admin(interaction):
+        await interaction.followup.send("You do not have permission to use this command.",ephemeral=True)
+        return
+    draft_instance = drafts.get(draft_object)
+    if not draft_instance or draft_instance.excel_manager is None:
+        await interaction.followup.send("Draft does not exist or has not started.", ephemeral=True)
+        return
+    #only finished drafts can be scored
+    if not draft_instance.finished:
+        await interaction.followup.send("Draft has not finished yet.", ephemeral=True)
+        return
+    #get the results and score them
+    try:
+        api = robotevents_handler.Robotevent(draft_instance.draft_name, draft_instance.draft_sku, RB_TOKEN)
+        results = await api.get_event_results()
+    except Exception as e:
+        print(f"[BOT] [FROM {draft_instance.draft_name.upper()}] Error Getting Results: {e}")
+        await interaction.followup.send(f"Could not get the results for {draft_instance.draft_sku}.", ephemeral=True)
+        return
+    draft_instance.set_standings(scoring.score_draft(draft_instance, results))
+    #draw the standings and send them
+    try:
+        image_data = await render_pool.render_results(draft_instance)
+    except RenderQueueFull:
+        await interaction.followup.send("Draft scored, but the bot is busy drawing right now, try again in a moment.", ephemeral=True)
+        return
+    except RenderFailed as e:
+        print(f"[BOT] [FROM {draft_instance.draft_name.upper()}] Error Drawing Standings: {e}")
+        await interaction.followup.send("Draft scored, but something went wrong drawing the standings, try again in a moment.", ephemeral=True)
+        return
+    files = [discord.File(io.BytesIO(image), filename=f"{draft_instance.draft_name}_results_{index + 1}.{extension}")
+             for index, (extension, image) in enumerate(image_data)]
+    for start in range(0, len(files), 10):
+        await interaction.followup.send(files=files[start:start + 10])
+    print(f"[BOT] [FROM {draft_instance.draft_name.upper()}] Draft Scored.")
+
 #function to set the downtime for the draft
 @bot.tree.command(name="set_skip_timing", description="Sets the timing for the skips in the draft")
 async def set_skip_timing(interaction: discord.Interaction, min_time_limit: int, timer_warning: int):
@@ -769,13 +1051,12 @@ async def set_skip_timing(interaction: discord.Interaction, min_time_limit: int,
         await interaction.followup.send("You do not have permission to use this command.",ephemeral=True)
         return
     #check what channel they are in and get the discord user
-    for draft in drafts:
-        if drafts[draft].channel == interaction.channel:
-            #set the time limit
-            drafts[draft].time_limit_min = min_time_limit
-            drafts[draft].timer_warning = timer_warning
-            await interaction.followup.send(f"Skip timing set to {min_time_limit} minutes with warning at {timer_warning} minutes.",ephemeral=True)
-            return
+    draft = get_channel_draft(interaction)
+    if draft is not None:
+        #set the time limit (this also moves the current turns deadlines to match)
+        drafts[draft].set_timing(min_time_limit, timer_warning)
+        await interaction.followup.send(f"Skip timing set to {min_time_limit} minutes with warning at {timer_warning} minutes.",ephemeral=True)
+        return
     #if there is no draft to affiliate with
     await interaction.followup.send(f"Channel is not affiliated with a draft.",ephemeral=True)
     return
@@ -798,11 +1079,11 @@ async def set_downtime(interaction: discord.Interaction, downtime_start: int, do
         await interaction.followup.send("You do not have permission to use this command.",ephemeral=True)
         return
     #check what channel they are in and get the discord user
-    for draft in drafts:
-        if drafts[draft].channel == interaction.channel:
-            drafts[draft].set_downtime(downtime_start, downtime_end)
-            await interaction.followup.send(f"Downtime set from {downtime_start}:00 to {downtime_end}:00.",ephemeral=True)
-            return
+    draft = get_channel_draft(interaction)
+    if draft is not None:
+        drafts[draft].set_downtime(downtime_start, downtime_end)
+        await interaction.followup.send(f"Downtime set from {downtime_start}:00 to {downtime_end}:00.",ephemeral=True)
+        return
     #if there is no draft to affiliate with
     await interaction.followup.send(f"Channel is not affiliated with a draft.",ephemeral=True)
     return
@@ -1014,19 +1295,13 @@ async def get_available_picks(interaction: discord.Interaction):
     #get what channel command was sent in, and the user id
     passed,draft = validation_check(interaction)
     if passed:
-        #make a new list of team strings so we don't mutate the draft's internal list
-        teams = drafts[draft].get_teams()
-        #make an empty list
-        picks = []
-        #remove the picks that have 0 remaining picks
-        for team in teams:
-            if not team["picks_remaining"] == 0:
-                picks.append(f'{team["team"]}, {team["picks_remaining"]} pick remaining')
-        #embed function for teams
+        #the draft keeps this list sorted and only holds teams with picks remaining
+        picks = drafts[draft].get_available_teams()
+        #embed function for teams (only the teams on the page being shown get formatted)
         def team_embed(items, page, total_pages):
             embed = discord.Embed(
                 title=f"Available Teams (Page {page + 1}/{total_pages})",
-                description="\n".join(items),
+                description="\n".join(f'{team.team}, {team.picks_remaining} pick remaining' for team in items),
                 color=discord.Color.green()
             )
             return embed
@@ -1059,14 +1334,21 @@ async def get_draft_image(interaction: discord.Interaction):
             if not draft_instance:
                 await interaction.followup.send("Draft does not exist.", ephemeral=True)
                 return
-            #update the excel file
-            draft_instance.excel_manager.fill_draft_sheet(draft_instance.draft_data)
-            #get an image of the draft sheet
-            image_path = draft_instance.excel_manager.get_draft_as_image()
-            #send the image
-            await interaction.followup.send(file=discord.File(image_path))
-            #delete the temporary image file
-            os.remove(image_path)
+            #get an image of the draft sheet (reused if nothing has changed since the last one)
+            try:
+                image_data = await render_pool.render_board(draft_instance)
+            except RenderQueueFull:
+                await interaction.followup.send("The bot is busy drawing boards right now, try again in a moment.", ephemeral=True)
+                return
+            except RenderFailed as e:
+                print(f"[BOT] [FROM {draft_instance.draft_name.upper()}] Error Drawing Board: {e}")
+                await interaction.followup.send("Something went wrong drawing the board, try again in a moment.", ephemeral=True)
+                return
+            #send the image (wide boards come in several pieces, discord takes up to 10 files a message)
+            files = [discord.File(io.BytesIO(image), filename=f"{draft_instance.draft_name}_draft_{index + 1}.{extension}")
+                     for index, (extension, image) in enumerate(image_data)]
+            for start in range(0, len(files), 10):
+                await interaction.followup.send(files=files[start:start + 10])
             #send the emoji in that channel
             print(f"[BOT] [FROM {drafts[draft].draft_name.upper()}] Image Sent.")
             return
@@ -1077,5 +1359,31 @@ async def get_draft_image(interaction: discord.Interaction):
     await interaction.response.send_message(f"You do not have permission to use this command.",ephemeral=True)
 
 
-#runs the bot on the token (very important yes very hmmm)
-bot.run(DS_TOKEN)
\ No newline at end of file
+"""
+STARTUP
+    -load_admin_ids (reads the admin bypass ids from the .env file)
+    -main (starts the bot)
+"""
+
+#function to read the admin bypass ids
+def load_admin_ids():
+    '''
+    helper function that reads the comma separated admin bypass ids from the .env file
+
+    :return: the ids of the users who can always use admin commands
+    :rtype: list
+    '''
+    return [int(user_id) for user_id in os.getenv("ADMIN_BYPASS_IDS", "").split(",") if user_id.strip()]
+
+#function to start the bot
+def main():
+    '''
+    function that reads the settings and runs the bot on the token (very important yes very hmmm)
+    '''
+    global ADMIN_BYPASS_IDS
+    ADMIN_BYPASS_IDS = load_admin_ids()
+    bot.run(DS_TOKEN)
+
+#only when run directly, the render pools worker processes import this file too
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,18 @@ Author: Jeremiah Nairn
 Description: Holds all of the functionality for processing the drafts
 """
 
-#importing csv for a savedata file
-import csv
 import time
 import os
 import random
 import sys
+import re
+import asyncio
+from collections import Counter, deque
 from manager import robotevents_handler
+from manager.records import Player, Team, QUEUE_SIZE
+from manager.timer_service import timers
+from manager.journal import DraftJournal, SNAPSHOT_EVERY_EVENTS, SNAPSHOT_INTERVAL_SECONDS, SNAPSHOT_FORMAT
+from manager.storage import get_storage
 
 #imports robotevents token from an encrypted .env file
 import os
@@ -19,6 +24,23 @@ from dotenv import load_dotenv
 load_dotenv()  
 RB_TOKEN = os.getenv("ROBOTEVENTS_TOKEN")
 
+#the journal events that change what the draft board looks like
+BOARD_EVENTS = frozenset(("players", "order", "pick", "team_add", "team_remove"))
+
+#helper function to turn saved standings (lists from the journal or storage) back into the tuples manager.scoring makes
+def unpack_standings(rows):
+    if not rows:
+        return None
+    return tuple((int(place), name, player_id, float(total), tuple(float(points) for points in round_points))
+                 for place, name, player_id, total, round_points in rows)
+
+#helper function that sorts team numbers the way people read them (2B before 10A)
+def team_sort_key(number):
+    match = re.match(r"(\d+)(.*)", str(number))
+    if match is None:
+        return (float("inf"), str(number))
+    return (int(match.group(1)), match.group(2))
+
 #main class
 class Draft:
     #initilizer
@@ -40,6 +62,14 @@ class Draft:
         self.max_picks = None
         #other draft memory and data
         self.draft_data = []
+        self.players_by_id = {} #player id -> player data
+        self.players_by_position = {} #draft position -> player data
+        self.teams_by_number = {} #team number -> team data
+        self.available = [] #teams with picks remaining, in no order (for random picks)
+        self.available_index = {} #team number -> index in self.available
+        #teams with picks remaining, sorted by team number (a plain list, an event only has a few hundred teams at most
+        #so shifting it on an add or remove is cheap next to everything else a pick does)
+        self.available_sorted = []
         self.current_position = current_position #the current position the draft is on
         self.real_position = 0 #the actual position of the bot
         self.time_limit_min = 0 #amount of time (in minutes) before the person is skipped automatically
@@ -48,55 +78,338 @@ class Draft:
         self.skip_downtime_start = 0 #the start time of the downtime period for skipping
         self.skip_downtime_end = 0 #the end time of the downtime period for skipping
         self.skip_check = False #will skip the current persons turn if set to true
+        self.turn_event = asyncio.Event() #set whenever something happens that the current turn should look at
+        self.turn_active = False #true while a drafter is on the clock
+        self.warning_timer = None #the pending warning deadline for the current turn
+        self.expiry_timer = None #the pending skip deadline for the current turn
+        self.warning_due = False #set by the warning timer, the runner sends the message
+        self.warning_sent = False #so the warning only goes out once per turn
         self.total_participants = 0 #the total number of participants in the draft
         #generate a random seed or set it
         self.seed = seed
+        #the team data is filled in by load_teams (so the api isnt called from inside the event loop)
+        self.draft_teams = []
+        self.teams = []
+        #crash recovery
+        self.journal = DraftJournal(name) #every change to the draft gets written here
+        self.replaying = False #true while the journal is being read back (so nothing gets written twice)
+        self.channel_id = None #the id of the channel the draft is running in (so it can be found again)
+        self.started = False #true once the draft has been started
+        self.finished = False #true once every pick has been made
+        self.standings = None #the scored results (from manager.scoring), once the event is over
+        self.version = 0 #goes up whenever the picks, players or teams change (used to cache the board image)
+        self.events_since_snapshot = 0 #journal events written since the last snapshot
+        self.last_snapshot = time.time() #when the last snapshot was taken
+        self.snapshot_pending = False #true while a snapshot is waiting to be taken
+        self.snapshot_timer = None #the pending background snapshot check (only while the draft is running)
+        #print to the console
+        print(f'[DRAFT] [FROM {name.upper()}] Draft Created.')
+
+    #function to load the team data from robotevents (must be awaited after creating the draft)
+    async def load_teams(self, priority = robotevents_handler.PRIORITY_INTERACTIVE):
         #creates the robotevents object
-        new_api = robotevents_handler.Robotevent(self.draft_name,draft_sku, RB_TOKEN)
+        new_api = robotevents_handler.Robotevent(self.draft_name, self.draft_sku, RB_TOKEN, priority=priority)
         #generates the team data
-        self.draft_teams = new_api.get_teams_from_event()
+        self.draft_teams = await new_api.get_teams_from_event()
         self.teams = self.generate_team_data(self.draft_teams)
-        #print to the console
-        print(f'[DRAFT] [FROM {name.upper()}] Draft Created.')
+        self.index_teams()
+        print(f'[DRAFT] [FROM {self.draft_name.upper()}] {len(self.teams)} Teams Loaded.')
+        return self.teams
+
+    #function to pull a fresh copy of the team list from robotevents (skipping the cache)
+    async def refresh_teams(self):
+        new_api = robotevents_handler.Robotevent(self.draft_name, self.draft_sku, RB_TOKEN, refresh=True)
+        self.draft_teams = await new_api.get_teams_from_event()
+        #only swap the team list out if the draft hasnt started picking yet
+        if self.total_participants == 0:
+            self.teams = self.generate_team_data(self.draft_teams)
+            self.index_teams()
+            self.save_draft()
+            return True
+        return False
+
+    #function to fill the draft back in from what the storage layer saved (nothing gets recorded)
+    def restore(self, saved):
+        self.announcement_id = saved["announcement_id"]
+        self.emoji = saved["emoji"]
+        self.announce_channel = saved["announce_channel_id"]
+        self.channel_id = saved["channel_id"]
+        self.real_position = saved["real_position"] or 0
+        self.total_participants = saved["total_participants"] or 0
+        self.max_picks = saved["max_picks"]
+        self.time_limit_min = saved["time_limit_min"] or 0
+        self.timer_warning = saved["timer_warning"] or 0
+        self.skip_downtime_start = saved["downtime_start"] or 0
+        self.skip_downtime_end = saved["downtime_end"] or 0
+        self.started = bool(saved["started"])
+        self.finished = bool(saved["finished"])
+        self.standings = unpack_standings(saved["standings"])
+        #players, in draft order
+        for id, user, name, position in saved["players"]:
+            player = Player(id, user, name, self.round_limit)
+            player.position = position
+            self.draft_data.append(player)
+            self.players_by_id[id] = player
+        self.index_positions()
+        for player_id, round, team in saved["picks"]:
+            player = self.players_by_id.get(player_id)
+            if player is not None and 1 <= round <= self.round_limit:
+                player.rounds[round-1] = team
+        #teams (if they were saved the api doesnt need to be called again)
+        if saved["teams"]:
+            self.teams = [Team(team, picks_remaining) for team, picks_remaining in saved["teams"]]
+            self.draft_teams = [team.team for team in self.teams]
+            self.index_teams()
+        self.version += 1
+        return bool(saved["teams"])
+
+    #function to write an event to the drafts journal (skipped while the journal is being replayed)
+    def record(self, kind, **data):
+        if kind in BOARD_EVENTS:
+            self.version += 1
+        if not self.replaying:
+            self.journal.append(kind, data)
+            self.store(kind, data)
+            self.events_since_snapshot += 1
+            if (self.events_since_snapshot >= SNAPSHOT_EVERY_EVENTS
+                    or time.time() - self.last_snapshot >= SNAPSHOT_INTERVAL_SECONDS):
+                self.request_checkpoint()
+
+    #function to write the rows an event changed to the storage layer
+    def store(self, kind, data):
+        storage = get_storage()
+        if kind == "players":
+            storage.save_players(self.draft_name, [self.players_by_id[id] for id, _, _ in data["players"]])
+        elif kind == "order":
+            storage.save_order(self)
+        elif kind == "pick":
+            storage.save_pick(self.draft_name, data["player"], data["round"], data["team"],
+                              self.teams_by_number[data["team"]].picks_remaining)
+        elif kind == "team_add":
+            storage.save_team(self.draft_name, data["team"], self.teams_by_number[data["team"]].picks_remaining)
+        elif kind == "team_remove":
+            storage.delete_team(self.draft_name, data["team"])
+        elif kind == "standings":
+            storage.save_standings(self.draft_name, data["standings"])
+        elif kind in ("start", "timing", "downtime", "turn", "finish"):
+            storage.save_draft(self)
+        #queues and skips only live in the journal
+
+    #helper function to record a players queue after it changes
+    def record_queue(self, player_data):
+        self.record("queue", player=player_data.id, queue=list(player_data.queue))
+
+    #function to take a snapshot once the current change has finished (straight away if there is no event loop)
+    def request_checkpoint(self):
+        if self.snapshot_pending:
+            return
+        self.snapshot_pending = True
+        try:
+            asyncio.get_running_loop().call_soon(self.checkpoint)
+        except RuntimeError:
+            self.checkpoint()
+
+    #function to pack the draft into a snapshot and clear out the journal
+    def checkpoint(self):
+        self.snapshot_pending = False
+        state = (
+            SNAPSHOT_FORMAT,
+            (self.current_position, self.real_position, self.total_participants, self.max_picks,
+             self.time_limit_min, self.timer_warning, self.skip_downtime_start, self.skip_downtime_end,
+             self.time_memory, self.channel_id, self.started, self.finished),
+            tuple((p.id, p.user, p.name, p.position, tuple(p.rounds), tuple(p.queue), p.double_pick)
+                  for p in self.draft_data),
+            tuple((team.team, team.picks_remaining) for team in self.teams),
+            self.standings,
+        )
+        size = self.journal.write_snapshot(state)
+        self.events_since_snapshot = 0
+        self.last_snapshot = time.time()
+        print(f'[DRAFT] [FROM {self.draft_name.upper()}] Snapshot Saved ({size} bytes).')
+
+    #function to start checking in the background if the draft is due a snapshot (so a quiet draft still gets one)
+    def start_snapshot_timer(self):
+        timers.cancel(self.snapshot_timer)
+        #one interval after the last snapshot, or from now if that has already gone by
+        when = self.last_snapshot + SNAPSHOT_INTERVAL_SECONDS
+        if when <= time.time():
+            when = time.time() + SNAPSHOT_INTERVAL_SECONDS
+        self.snapshot_timer = timers.schedule(when, self.on_snapshot_timer)
+
+    #function to stop the background snapshot checks
+    def stop_snapshot_timer(self):
+        timers.cancel(self.snapshot_timer)
+        self.snapshot_timer = None
+
+    #called by the timer service once the snapshot interval has gone by
+    def on_snapshot_timer(self):
+        self.snapshot_timer = None
+        #only worth a snapshot if something was written since the last one
+        if self.events_since_snapshot > 0 and time.time() - self.last_snapshot >= SNAPSHOT_INTERVAL_SECONDS:
+            self.request_checkpoint()
+        self.start_snapshot_timer()
+
+    #function to load the draft back from its last snapshot, returns true if there was one
+    def load_snapshot(self):
+        state = self.journal.read_snapshot()
+        if state is None or state[0] != SNAPSHOT_FORMAT:
+            return False
+        _, values, players, teams, self.standings = state
+        (self.current_position, self.real_position, self.total_participants, self.max_picks,
+         self.time_limit_min, self.timer_warning, self.skip_downtime_start, self.skip_downtime_end,
+         self.time_memory, self.channel_id, self.started, self.finished) = values
+        self.draft_data = []
+        self.players_by_id = {}
+        for id, user, name, position, rounds, queue, double_pick in players:
+            player = Player(id, user, name, self.round_limit, position)
+            player.rounds = list(rounds)
+            player.queue.extend(queue)
+            player.double_pick = double_pick
+            self.draft_data.append(player)
+            self.players_by_id[id] = player
+        self.index_positions()
+        if teams:
+            self.teams = [Team(team, picks_remaining) for team, picks_remaining in teams]
+            self.draft_teams = [team.team for team in self.teams]
+            self.index_teams()
+        self.version += 1
+        return True
+
+    #function to rebuild the draft from its journal, returns how many events were replayed
+    def replay_journal(self):
+        events = self.journal.read()
+        if not events:
+            return 0
+        self.replaying = True
+        try:
+            for event in events:
+                self.apply_event(event)
+        finally:
+            self.replaying = False
+        #picks remaining is worked out from the picks themselves, so replaying is safe to repeat
+        self.recount_picks()
+        print(f'[DRAFT] [FROM {self.draft_name.upper()}] Replayed {len(events)} Journal Events.')
+        #fold the replayed events into a snapshot so the next restart doesnt have to replay them again
+        self.checkpoint()
+        return len(events)
+
+    #function to apply a single journal event to the draft
+    def apply_event(self, event):
+        kind = event["kind"]
+        if kind == "players":
+            self.generate_player_data([{"id": id, "name": user, "nick": name} for id, user, name in event["players"]
+                                       if id not in self.players_by_id])
+        elif kind == "order":
+            for position, player_id in enumerate(event["order"]):
+                self.players_by_id[player_id].position = position
+            self.total_participants = len(event["order"])
+            self.max_picks = event["max_picks"]
+            self.index_positions()
+        elif kind == "queue":
+            self.players_by_id[event["player"]].queue = deque(event["queue"], maxlen=QUEUE_SIZE)
+        elif kind == "pick":
+            player_data = self.players_by_id[event["player"]]
+            player_data.rounds[event["round"]-1] = event["team"]
+            if "queue" in event:
+                player_data.queue = deque(event["queue"], maxlen=QUEUE_SIZE)
+        elif kind == "team_add":
+            self.add_team(event["team"])
+        elif kind == "team_remove":
+            self.remove_team(event["team"])
+        elif kind == "start":
+            self.channel_id = event["channel"]
+            self.started = True
+        elif kind == "timing":
+            self.time_limit_min = event["limit"]
+            self.timer_warning = event["warning"]
+        elif kind == "downtime":
+            self.skip_downtime_start = event["start"]
+            self.skip_downtime_end = event["end"]
+        elif kind == "turn":
+            self.real_position = event["real_position"]
+            self.current_position = event["position"]
+        elif kind == "finish":
+            self.finished = True
+        elif kind == "standings":
+            self.standings = unpack_standings(event["standings"])
+
+    #function to work picks remaining back out from everyones picks
+    def recount_picks(self):
+        if self.max_picks is None:
+            return
+        counts = Counter(pick for player in self.draft_data for pick in player.rounds if pick is not None)
+        for team in self.teams:
+            team.picks_remaining = max(0, self.max_picks - counts[team.team])
+        self.index_available()
+
+    #function to mark the draft as started in a channel
+    def mark_started(self, channel):
+        self.channel = channel
+        self.channel_id = channel.id
+        self.started = True
+        self.record("start", channel=channel.id)
+
+    #function to move the draft on to a new pick
+    def advance_to(self, real_position, current_position):
+        self.real_position = real_position
+        self.current_position = current_position
+        self.record("turn", real_position=real_position, position=current_position)
+
+    #function to mark the draft as finished
+    def mark_finished(self):
+        self.finished = True
+        self.record("finish")
+        self.checkpoint()
+
+    #function to save the scored results of the draft (from manager.scoring)
+    def set_standings(self, standings):
+        self.standings = standings
+        self.record("standings", standings=standings)
+
+    #function to set the skip timer for the draft
+    def set_timing(self, time_limit_min, timer_warning):
+        self.time_limit_min = time_limit_min
+        self.timer_warning = timer_warning
+        self.record("timing", limit=time_limit_min, warning=timer_warning)
+        #move the current turns deadlines to match
+        self.schedule_turn_timers()
+
+    #function to wake the draft runner up so it re-checks the current turn straight away
+    def wake(self):
+        self.turn_event.set()
+
+    #function to skip whoever is currently picking
+    def request_skip(self):
+        self.skip_check = True
+        self.record("skip", real_position=self.real_position)
+        self.wake()
 
-    #function to save the detail values
+    #function that sleeps until the draft is woken up or the timeout runs out (None waits forever)
+    async def wait_for_wake(self, timeout = None):
+        try:
+            await asyncio.wait_for(self.turn_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self.turn_event.clear()
+
+    #function that gets the number of the current round (starting at 1)
+    def get_current_round(self):
+        if self.total_participants == 0:
+            return 0
+        return self.real_position // self.total_participants + 1
+
+    #function to get the time (in seconds) before the current drafter is skipped (None if there is no limit)
+    def get_time_remaining(self):
+        if self.time_limit_min <= 0 or self.time_memory == 0:
+            return None
+        return max(0, self.time_memory + self.time_limit_min * 60 - time.time())
+
+    #function to save the detail values (and the team list, while it can still change)
     def save_draft(self):
-        path = 'drafts.csv'
-        #ensure parent directory exists if a directory was provided
-        dirpath = os.path.dirname(path)
-        if dirpath and not os.path.exists(dirpath):
-            os.makedirs(dirpath, exist_ok=True)
-        #read existing rows
-        rows = []
-        if os.path.exists(path):
-            with open(path, mode='r', newline='', encoding='utf-8') as draft_file:
-                rows = list(csv.reader(draft_file))
-        #prepare the row to save (convert None to empty string)
-        def ck(v):
-            return '' if v is None else str(v)
-        new_row = [
-            ck(self.draft_name), #0
-            ck(self.people_limit), #1
-            ck(self.round_limit), #2
-            ck(self.announcement_id), #3
-            ck(self.emoji), #4
-            ck(getattr(self.announce_channel, "id", self.announce_channel)), #5
-            ck(self.draft_sku), #6
-            ck(self.seed), #7
-            ck(self.current_position)] #8
-        #replace an existing entry with the same draft_name or append if not found
-        replaced = False
-        for i, row in enumerate(rows):
-            if row and row[0] == self.draft_name:
-                rows[i] = new_row
-                replaced = True
-                break
-        if not replaced:
-            rows.append(new_row)
-        #write all rows back to the file
-        with open(path, mode='w', newline='', encoding='utf-8') as draft_file:
-            writer = csv.writer(draft_file)
-            writer.writerows(rows)
+        storage = get_storage()
+        storage.save_draft(self)
+        if self.total_participants == 0:
+            storage.save_teams(self.draft_name, self.teams)
         return True
 
     #function to log the announcement for the channel
@@ -115,7 +428,9 @@ class Draft:
         #set the downtime in the object
         self.skip_downtime_start = downtime_start
         self.skip_downtime_end = downtime_end
-        pass
+        self.record("downtime", start=downtime_start, end=downtime_end)
+        #a deadline that was pushed back for the old downtime needs to be looked at again
+        self.schedule_turn_timers()
 
     #function to determine if the programs skips are in downtime
     def is_in_downtime(self):
@@ -127,60 +442,149 @@ class Draft:
         else:
             return current_hour >= self.skip_downtime_start or current_hour < self.skip_downtime_end
 
+    #function to get the next time (as a timestamp) the downtime period ends
+    def downtime_end_time(self):
+        now = time.localtime()
+        #the end hour today, or tomorrow if that has already gone by (mktime sorts out day/month rollover and dst)
+        end = time.mktime((now.tm_year, now.tm_mon, now.tm_mday, self.skip_downtime_end, 0, 0, 0, 0, -1))
+        if end <= time.time():
+            end = time.mktime((now.tm_year, now.tm_mon, now.tm_mday + 1, self.skip_downtime_end, 0, 0, 0, 0, -1))
+        return end
+
+    #function to put the current drafter on the clock (called once at the start of each turn)
+    def start_turn_timers(self):
+        self.turn_active = True
+        self.warning_due = False
+        self.warning_sent = False
+        self.schedule_turn_timers()
+
+    #function to take the current drafter off the clock
+    def end_turn_timers(self):
+        self.turn_active = False
+        timers.cancel(self.warning_timer)
+        timers.cancel(self.expiry_timer)
+        self.warning_timer = None
+        self.expiry_timer = None
+
+    #function to register the warning and skip deadlines for the current turn with the timer service
+    def schedule_turn_timers(self):
+        timers.cancel(self.warning_timer)
+        timers.cancel(self.expiry_timer)
+        self.warning_timer = None
+        self.expiry_timer = None
+        if not self.turn_active or self.time_limit_min <= 0:
+            return
+        expiry = self.time_memory + self.time_limit_min * 60
+        #the warning fires right away if we are already inside of the warning window
+        if not self.warning_sent:
+            self.warning_timer = timers.schedule(expiry - self.timer_warning * 60, self.on_warning_timer)
+        self.expiry_timer = timers.schedule(expiry, self.on_expiry_timer)
+
+    #called by the timer service when its time to warn the drafter
+    def on_warning_timer(self):
+        self.warning_timer = None
+        self.warning_due = True
+        self.wake()
+
+    #called by the timer service when the drafters time runs out
+    def on_expiry_timer(self):
+        self.expiry_timer = None
+        if self.is_in_downtime():
+            #dont skip during downtime, come back when it ends instead
+            self.expiry_timer = timers.schedule(self.downtime_end_time(), self.on_expiry_timer)
+            print(f"[DRAFT] [FROM {self.draft_name.upper()}] Time Limit Reached During Downtime, Skip Pushed Back.")
+            return
+        print(f"[DRAFT] [FROM {self.draft_name.upper()}] Time Limit Exceeded. Skipping Turn.")
+        self.request_skip()
+
     #function to return the team data
     def get_teams(self):
         return self.teams
 
+    #function to get a players data from their id (None if they arent in the draft)
+    def get_player(self, player_id):
+        return self.players_by_id.get(player_id)
+
+    #function to get the players data for a draft position (None if nobody has it)
+    def get_player_at(self, position):
+        return self.players_by_position.get(position)
+
+    #function to rebuild the team lookup after self.teams is replaced
+    def index_teams(self):
+        self.teams_by_number = {team.team: team for team in self.teams}
+        self.index_available()
+
+    #function to rebuild the available team structures from scratch
+    def index_available(self):
+        self.available = [team for team in self.teams if team.picks_remaining > 0]
+        self.available_index = {team.team: i for i, team in enumerate(self.available)}
+        self.available_sorted = sorted(self.available, key=lambda team: team_sort_key(team.team))
+
+    #function to keep the available team structures in line after a teams picks_remaining changes
+    def update_availability(self, team):
+        listed = team.team in self.available_index
+        if team.picks_remaining > 0 and not listed:
+            #add it to the unordered list
+            self.available_index[team.team] = len(self.available)
+            self.available.append(team)
+            #and slot it into the sorted view (teams only come back when an admin adds one, so a scan is fine)
+            key = team_sort_key(team.team)
+            i = next((i for i, other in enumerate(self.available_sorted) if team_sort_key(other.team) > key),
+                     len(self.available_sorted))
+            self.available_sorted.insert(i, team)
+        elif team.picks_remaining <= 0 and listed:
+            #swap the last team into its spot so the removal doesnt shift the list
+            i = self.available_index.pop(team.team)
+            last = self.available.pop()
+            if last is not team:
+                self.available[i] = last
+                self.available_index[last.team] = i
+            #take it out of the sorted view
+            self.available_sorted.remove(team)
+
+    #function to return the teams that can still be picked, sorted by team number
+    def get_available_teams(self):
+        return self.available_sorted
+
+    #function to rebuild the position lookup after positions are handed out
+    def index_positions(self):
+        self.players_by_position = {player.position: player for player in self.draft_data}
+
     #function to return the queue data
     def get_queue(self, player_id):
-        for player_data in self.draft_data:
-            if player_data["id"] == player_id:
-                picks = [player_data["queue_1"],player_data["queue_2"],player_data["queue_3"],player_data["queue_4"]]
-                return picks
+        player_data = self.players_by_id.get(player_id)
+        if player_data is None:
+            return None
+        return player_data.queue_slots()
             
     #function that takes a list of dicts containing playerdata
     def generate_player_data(self,player_data):
-        #for each player, turn them into an expanded dict and add them to the player list
+        #for each player, turn them into a player record and add them to the player list
         for current_player in player_data:
-            #create the dict
-            player = {"id":current_player["id"], "user":current_player["name"],"name":current_player["nick"]} #user data
-            #add the extra data
-            for r in range(self.round_limit):
-                player[f"round_{r+1}"] = None
-            #add the queue spots
-            for i in range(4):
-                player[f"queue_{i+1}"] = None
-            #give the player a position
-            player["position"] = 0
+            #create the record (rounds and queue start empty, position starts at 0)
+            player = Player(current_player["id"], current_player["name"], current_player["nick"], self.round_limit)
             #add the player to the list
             self.draft_data.append(player)
+            self.players_by_id[player.id] = player
+        self.record("players", players=[[p["id"], p["name"], p["nick"]] for p in player_data])
         return
     
-    #function to generate a list of dicts containing teams and how many picks they have
+    #function to generate a list of team records containing teams and how many picks they have
     def generate_team_data(self,draft_teams):
-        #create an empty team object
-        teams = []
-        #for each team, turn them into a dict and add them into a new list
-        for current_team in draft_teams:
-            #turn into dict and add to list
-            team = {"team": current_team}
-            teams.append(team)
-        return teams
+        #for each team, turn them into a record and add them into a new list
+        return [Team(current_team) for current_team in draft_teams]
 
     #function to make sure the player is a valid participate in the draft
     def validate_participant(self,player_id):
-        for player_data in self.draft_data:
-            if player_data["id"] == player_id:
-                return True
-        return False
+        return player_id in self.players_by_id
     
     #function to check if the team is available to pick
     def validate_availability(self,pick):
         # make sure the pick exists and has picks remaining
-        for team in self.teams:
-            if team.get("team") == pick:
-                return team.get("picks_remaining", 0) > 0
-        return False
+        team = self.teams_by_number.get(pick)
+        if team is None:
+            return False
+        return team.picks_remaining > 0
     
     #function to set the draft order
     def set_draft_order(self):
@@ -191,51 +595,62 @@ class Draft:
             self.draft_data = random.shuffle(self.draft_data)
         #set the positions
         for drafter in self.draft_data:
-            drafter["position"] = self.total_participants
-            print(f"{drafter['name']}, {drafter['position']}")
+            drafter.position = self.total_participants
+            print(f"{drafter.name}, {drafter.position}")
             self.total_participants +=1
+        self.index_positions()
         #get the total possible amount of picks
         picks_available = ((self.total_participants*self.round_limit)/len(self.teams))+1
+        self.max_picks = int(picks_available)
         #assign the picks to each team
         for team in self.teams:
-            team["picks_remaining"] = int(picks_available)
+            team.picks_remaining = self.max_picks
+        self.index_available()
+        self.record("order", order=[p.id for p in sorted(self.draft_data, key=lambda p: p.position)], max_picks=self.max_picks)
         return
 
     #function to add a team from the team list
     def add_team(self, team):
         #check if the team is not already in the draft
-        for teamcheck in self.teams:
-            if teamcheck.get("team") == team:
-                return False
+        if team in self.teams_by_number:
+            return False
         #if its not, it will progress here, where it will add the team
-        team = {"team": team, "picks_remaining":self.max_picks}
-        self.teams.append(team)
+        team_entry = Team(team, self.max_picks)
+        self.teams.append(team_entry)
+        self.teams_by_number[team] = team_entry
+        self.update_availability(team_entry)
+        self.record("team_add", team=team)
         return True
 
     #function to remove a team from the team list
     def remove_team(self, team):
-        #check if the team is not already in the draft
-        for teamcheck in self.teams:
-            if teamcheck["team"] == team:
-                #when the team is located, remove it from the list
-                self.teams.remove(teamcheck)
-                #remove the team from everyones picks
-                for player in self.draft_data:
-                    for round in range(self.round_limit):
-                        if team == player[f"round_{round+1}"]:
-                            player[f"round_{round+1}"] = None
-                return True
-        return False
+        #check if the team is in the draft
+        teamcheck = self.teams_by_number.pop(team, None)
+        if teamcheck is None:
+            return False
+        #when the team is located, remove it from the list
+        self.teams.remove(teamcheck)
+        teamcheck.picks_remaining = 0
+        self.update_availability(teamcheck)
+        #remove the team from everyones picks
+        for player in self.draft_data:
+            rounds = player.rounds
+            if team in rounds:
+                for round in range(self.round_limit):
+                    if rounds[round] == team:
+                        rounds[round] = None
+        self.record("team_remove", team=team)
+        return True
     
     #function to clear the users picks
     def clear_picks(self,player_id):
-        player_data = next((pd for pd in self.draft_data if pd.get("id") == player_id), None)
+        player_data = self.players_by_id.get(player_id)
         if player_data is None:
             return False
-        #set all of the queue picks to none
-        for queue in range (4):
-            player_data[f"queue_{queue+1}"] = None
-        player_data["double_pick"] = False
+        #empty out the queue
+        player_data.queue.clear()
+        player_data.double_pick = False
+        self.record_queue(player_data)
         return True
 
     #function to pick for a player from the queue (needs to be rewritten)
@@ -244,36 +659,32 @@ class Draft:
         success = False
         if self.clear_picks(player_id):
             if self.validate_availability(pick):
-                success = True
                 #set players pick in the queue
-                for player_data in self.draft_data:
-                    if player_data["id"] == player_id:
-                        player_data["queue_1"] = pick
-                        player_data["double_pick"] = False
-                        success = True
-                        break
-                    else:
-                        success = False
+                player_data = self.players_by_id[player_id]
+                player_data.queue.append(pick)
+                player_data.double_pick = False
+                success = True
+                self.record_queue(player_data)
+                self.wake()
         #return false if found is false, otherwise true
         return success
     
     #function to pick a random team for a player
     def pick_random(self, player_id):
         success = False
-        #get a list of available teams
-        available_teams = [team["team"] for team in self.teams if team.get("picks_remaining", 0) > 0]
-        if not available_teams:
+        #make sure there are teams left to pick
+        if not self.available:
             return False
         #pick a random team from the available teams
-        random_pick = random.choice(available_teams)
+        random_pick = random.choice(self.available).team
         if self.clear_picks(player_id):
             #put the random pick in the players queue
-            for player_data in self.draft_data:
-                if player_data["id"] == player_id:
-                    player_data["queue_1"] = random_pick
-                    player_data["double_pick"] = False
-                    success = True
-                    break
+            player_data = self.players_by_id[player_id]
+            player_data.queue.append(random_pick)
+            player_data.double_pick = False
+            success = True
+            self.record_queue(player_data)
+            self.wake()
         return success
 
     #function to add more teams to a players queue
@@ -282,21 +693,22 @@ class Draft:
         #clear the picks
         if self.clear_picks(player_id):
             #find the player once
-            player_data = next((pd for pd in self.draft_data if pd.get("id") == player_id), None)
+            player_data = self.players_by_id.get(player_id)
             if player_data is None:
                 return False
             #iterate over picks without mutating the input and fill up to 4 slots
-            assigned = 0
             for pick in picks:
-                if assigned >= 4:
+                if len(player_data.queue) >= QUEUE_SIZE:
                     break
                 if not self.validate_availability(pick):
                     continue
-                #set player's queue slot (1-based) and double_pick flag
-                player_data[f"queue_{assigned+1}"] = pick
+                #add to the back of the player's queue
+                player_data.queue.append(pick)
                 #log and mark success
                 success = True
-                assigned += 1
+            if success:
+                self.record_queue(player_data)
+                self.wake()
         return success
 
     #function to force a pick for a player
@@ -305,51 +717,48 @@ class Draft:
 
     #function to put a pick in queue and validate if it processed
     def process_pick(self, position, round):
-        #helper function only used here
-        def shift_queue(player_data):
-            for pos in range(3):
-                player_data[f"queue_{pos+1}"] = player_data.get(f"queue_{pos+2}")
-            player_data["queue_4"] = None
-
         # find player by draft position
-        player_data = next((pd for pd in self.draft_data if pd.get("position") == position), None)
+        player_data = self.players_by_position.get(position)
         if player_data is None:
             return False
-        round_field = f"round_{round}"
+        queue = player_data.queue
+        # if the round is invalid, none of the queued picks can be used
+        if not 1 <= round <= len(player_data.rounds):
+            if queue:
+                queue.clear()
+                self.record_queue(player_data)
+            return False
         #loop until we consume a valid pick or there are no picks left
-        while True:
-            pick = player_data.get("queue_1")
-            if pick is None:
-                return False
-            # if round field is invalid, drop this pick and shift left
-            if round_field not in player_data:
-                shift_queue(player_data)
-                continue
+        dropped = False
+        while queue:
+            #take the next pick off of the front of the queue
+            pick = queue.popleft()
             # ensure the pick is still available (team exists and has picks)
-            team_entry = next((t for t in self.teams if t["team"] == pick), None)
-            if team_entry is None or team_entry.get("picks_remaining", 0) <= 0:
-                #drop the invalid pick and shift left
-                shift_queue(player_data)
+            team_entry = self.teams_by_number.get(pick)
+            if team_entry is None or team_entry.picks_remaining <= 0:
+                dropped = True
                 continue
             #place the pick into the current round
-            player_data[round_field] = pick
-            team_entry["picks_remaining"] -= 1
-            #shift the queue forward
-            shift_queue(player_data)
+            player_data.rounds[round-1] = pick
+            team_entry.picks_remaining -= 1
+            self.update_availability(team_entry)
+            self.record("pick", player=player_data.id, round=round, team=pick, queue=list(queue))
             #declare what the user has picked in the console
-            print(f'[DRAFT] [FROM {self.draft_name.upper()}] {player_data["name"]} picked {pick} for Round {round}')
+            print(f'[DRAFT] [FROM {self.draft_name.upper()}] {player_data.name} picked {pick} for Round {round}')
             return True
+        #the queue only had picks that were gone
+        if dropped:
+            self.record_queue(player_data)
+        return False
         
     #function return a players picks
     def get_picks(self,player_id):
-        #find the players entry in the list
-        for player_data in self.draft_data:
-            if player_data["id"] == player_id:
-                #make an empty list, and add all of the picks to it
-                picks = []
-                for r in range(self.round_limit):
-                    picks.append(player_data[f"round_{r+1}"])
-                return picks
+        #find the players entry
+        player_data = self.players_by_id.get(player_id)
+        if player_data is None:
+            return None
+        #copy the picks so the caller cant change them
+        return list(player_data.rounds)
             
     #helper function thats only used in the below 2 functions to get the real position of the draft
     def get_real_position(self, round_number, snake_position):
@@ -374,30 +783,32 @@ class Draft:
     #function to see if the user has a pick that it needs to fulfil (returns a bool)
     def needs_skip_fulfilled(self,player_id):
         #get the player data
-        player_data = next((pd for pd in self.draft_data if pd.get("id") == player_id), None)
+        player_data = self.players_by_id.get(player_id)
         if player_data is None:
             return False
         #for each round, check if the pick was skipped
         for round in range(self.round_limit):
-            if player_data[f"round_{round+1}"] == None and self.get_real_position(round, player_data["position"]) < self.real_position:
+            if player_data.rounds[round] == None and self.get_real_position(round, player_data.position) < self.real_position:
                 return True
         return False
 
     #function to fulfil a pick if the player was skipped
     def fulfill_pick_skip(self,player_id,pick):
             #get the player data
-            player_data = next((pd for pd in self.draft_data if pd.get("id") == player_id), None)
+            player_data = self.players_by_id.get(player_id)
             if player_data is None:
                 return 0
             #for each round, check if the pick was skipped
             for round in range(self.round_limit):
-                if player_data[f"round_{round+1}"] == None and self.get_real_position(round, player_data["position"]) < self.real_position:
+                if player_data.rounds[round] == None and self.get_real_position(round, player_data.position) < self.real_position:
                     #validate the pick and process it
                     if self.validate_availability(pick):
-                        player_data[f"round_{round+1}"] = pick
+                        player_data.rounds[round] = pick
                         #take the pick out of self.teams
-                        team_entry = next((t for t in self.teams if t["team"] == pick), None)
-                        team_entry["picks_remaining"] -= 1
+                        team_entry = self.teams_by_number[pick]
+                        team_entry.picks_remaining -= 1
+                        self.update_availability(team_entry)
+                        self.record("pick", player=player_data.id, round=round+1, team=pick)
                         return round+1
                     return 0
             return 0
\ No newline at end of file
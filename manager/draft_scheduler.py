@@ -0,0 +1,53 @@
+"""
+File: manager/draft_scheduler.py
+Author: Jeremiah Nairn
+
+Description: Holds the scheduler that runs every active draft as a task on the bots event loop
+"""
+
+#imports
+import asyncio
+
+class DraftScheduler:
+    #constructor
+    def __init__(self):
+        self.running = {} #draft name -> (draft instance, task)
+
+    #function to start running a draft (runner is the coroutine function that runs it)
+    def start(self, draft_instance, runner, *args):
+        name = draft_instance.draft_name
+        if self.is_running(name):
+            return False
+        task = asyncio.ensure_future(runner(draft_instance, *args))
+        self.running[name] = (draft_instance, task)
+        #clean up (and report crashes) when the draft finishes
+        task.add_done_callback(lambda finished: self.finished(name, finished))
+        print(f"[SCHEDULER] [FROM {name.upper()}] Draft Task Started ({len(self.running)} active).")
+        return True
+
+    #function that gets called when a draft task ends
+    def finished(self, name, task):
+        #only forget the task if it is still the one we are tracking
+        if name in self.running and self.running[name][1] is task:
+            del self.running[name]
+        if task.cancelled():
+            print(f"[SCHEDULER] [FROM {name.upper()}] Draft Task Cancelled.")
+        elif task.exception() is not None:
+            print(f"[SCHEDULER] [FROM {name.upper()}] Draft Task Crashed: {task.exception()!r}")
+        else:
+            print(f"[SCHEDULER] [FROM {name.upper()}] Draft Task Finished.")
+
+    #function to check if a draft is currently running
+    def is_running(self, name):
+        return name in self.running and not self.running[name][1].done()
+
+    #function to stop a running draft
+    def cancel(self, name):
+        if not self.is_running(name):
+            return False
+        self.running[name][1].cancel()
+        return True
+
+    #function to get every running draft instance
+    def active_drafts(self):
+        return [draft_instance for draft_instance, task in self.running.values() if not task.done()]
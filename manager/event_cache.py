@@ -0,0 +1,103 @@
+"""
+File: manager/event_cache.py
+Author: Jeremiah Nairn
+
+Description: Holds the on-disk cache for Robotevents lookups (sku -> event id, event id -> teams)
+"""
+
+#imports
+import json
+import os
+import sqlite3
+import threading
+import time
+
+#where the cache lives on disk
+CACHE_PATH = "robotevents_cache.db"
+#how long (in seconds) a cached entry is trusted before it gets revalidated
+CACHE_TTL_SECONDS = 6 * 60 * 60
+
+class EventCache:
+    #constructor
+    def __init__(self, path = CACHE_PATH, ttl = CACHE_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        #ensure parent directory exists if a directory was provided
+        dirpath = os.path.dirname(path)
+        if dirpath and not os.path.exists(dirpath):
+            os.makedirs(dirpath, exist_ok=True)
+        #open the database and make the table if its not there yet
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "etag TEXT, last_modified TEXT, fetched_at REAL NOT NULL, "
+            "PRIMARY KEY (kind, key))"
+        )
+        self.connection.commit()
+
+    #function to get an entry from the cache (returns None if there isnt one)
+    def get(self, kind, key):
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT value, etag, last_modified, fetched_at FROM entries WHERE kind = ? AND key = ?",
+                (kind, str(key))
+            ).fetchone()
+        if row is None:
+            return None
+        return {"value": json.loads(row[0]), "etag": row[1], "last_modified": row[2], "fetched_at": row[3]}
+
+    #function to check if an entry is still inside of its ttl
+    def is_fresh(self, entry):
+        return entry is not None and (time.time() - entry["fetched_at"]) < self.ttl
+
+    #function to store an entry in the cache
+    def put(self, kind, key, value, etag = None, last_modified = None):
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO entries (kind, key, value, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, str(key), json.dumps(value), etag, last_modified, time.time())
+            )
+            self.connection.commit()
+
+    #function to restart the ttl of an entry (used when the api says nothing changed)
+    def touch(self, kind, key):
+        with self.lock:
+            self.connection.execute(
+                "UPDATE entries SET fetched_at = ? WHERE kind = ? AND key = ?",
+                (time.time(), kind, str(key))
+            )
+            self.connection.commit()
+
+    #function to drop an entry so the next lookup goes to the api
+    def invalidate(self, kind, key):
+        with self.lock:
+            self.connection.execute("DELETE FROM entries WHERE kind = ? AND key = ?", (kind, str(key)))
+            self.connection.commit()
+
+#helper function that builds the conditional request headers for a cached entry
+def conditional_headers(entry):
+    headers = {}
+    if entry is None:
+        return headers
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+#the cache shared by the whole bot (opened the first time its needed, so importing this doesnt touch the disk)
+_cache = None
+
+#function to get the shared cache, opening it if it isnt open yet
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = EventCache()
+    return _cache
+
+#function to swap the shared cache for another one (the stand-in uses a throwaway in-memory cache)
+def set_cache(new_cache):
+    global _cache
+    _cache = new_cache
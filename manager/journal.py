@@ -0,0 +1,137 @@
+"""
+File: manager/journal.py
+Author: Jeremiah Nairn
+
+Description: Holds the append-only journal that records everything that happens in a draft,
+so an in-progress draft can be rebuilt after a restart
+"""
+
+#imports
+import asyncio
+import json
+import os
+import pickle
+import re
+import time
+import zlib
+
+#where the journals are kept
+JOURNAL_DIR = "journals"
+#how long (in seconds) events are held so they can be written and synced together
+FLUSH_DELAY_SECONDS = 0.05
+#a snapshot is taken after this many events, or once this many seconds have passed since the last one
+SNAPSHOT_EVERY_EVENTS = 200
+SNAPSHOT_INTERVAL_SECONDS = 600
+#the layout of the state a snapshot holds, bump it whenever that layout changes
+#(a snapshot in any other format is ignored, the saved rows and the journal still have everything in it)
+SNAPSHOT_FORMAT = 2
+
+#helper function to turn a draft name into a safe, unique file name
+def journal_filename(name):
+    safe = re.sub(r"[^A-Za-z0-9_-]", "_", name)[:40]
+    return f"{safe}_{zlib.crc32(name.encode('utf-8')):08x}"
+
+class DraftJournal:
+    #constructor
+    def __init__(self, name, folder = JOURNAL_DIR):
+        self.name = name
+        self.folder = folder
+        self.path = os.path.join(folder, journal_filename(name) + ".log")
+        self.snapshot_path = os.path.join(folder, journal_filename(name) + ".snap")
+        self.pending = [] #lines waiting to be written
+        self.flush_handle = None #the scheduled flush (if there is one)
+        self.file = None
+
+    #function to add an event to the journal (written out in the next batch)
+    def append(self, kind, data):
+        event = {"t": round(time.time(), 3), "kind": kind}
+        event.update(data)
+        self.pending.append(json.dumps(event, separators=(",", ":")) + "\n")
+        if self.flush_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            #no event loop (scripts, tests), just write it now
+            self.flush()
+            return
+        self.flush_handle = loop.call_later(FLUSH_DELAY_SECONDS, self.flush)
+
+    #function to write every pending event and sync it to disk
+    def flush(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        if not self.pending:
+            return
+        if self.file is None:
+            os.makedirs(self.folder, exist_ok=True)
+            self.file = open(self.path, "a", encoding="utf-8")
+        self.file.write("".join(self.pending))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending = []
+
+    #function to read every event back out of the journal
+    def read(self):
+        events = []
+        if not os.path.exists(self.path):
+            return events
+        with open(self.path, "r", encoding="utf-8") as journal_file:
+            for line in journal_file:
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    #a torn write from a crash, everything after it is unusable
+                    print(f"[JOURNAL] [FROM {self.name.upper()}] Ignoring Damaged Journal Tail.")
+                    break
+        return events
+
+    #function to wipe the journal
+    def truncate(self):
+        self.pending = []
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        self.close()
+        if os.path.exists(self.path):
+            with open(self.path, "w", encoding="utf-8") as journal_file:
+                journal_file.flush()
+                os.fsync(journal_file.fileno())
+
+    #function to save a snapshot of the draft and start the journal over (everything in it is in the snapshot)
+    #(the journal is only ever cleared here, so snapshot + journal always adds up to the whole draft)
+    def write_snapshot(self, state):
+        data = zlib.compress(pickle.dumps(state, pickle.HIGHEST_PROTOCOL))
+        os.makedirs(self.folder, exist_ok=True)
+        #write it next to the old one and swap it in, so a crash leaves one or the other whole
+        temp_path = self.snapshot_path + ".tmp"
+        with open(temp_path, "wb") as snapshot_file:
+            snapshot_file.write(data)
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        self.truncate()
+        return len(data)
+
+    #function to read the last snapshot back (None if there isnt a usable one)
+    def read_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return None
+        try:
+            with open(self.snapshot_path, "rb") as snapshot_file:
+                return pickle.loads(zlib.decompress(snapshot_file.read()))
+        except Exception as e:
+            print(f"[JOURNAL] [FROM {self.name.upper()}] Ignoring Damaged Snapshot: {e}")
+            return None
+
+    #function to delete the snapshot
+    def remove_snapshot(self):
+        if os.path.exists(self.snapshot_path):
+            os.remove(self.snapshot_path)
+
+    #function to close the journal file
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
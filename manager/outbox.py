@@ -0,0 +1,103 @@
+"""
+File: manager/outbox.py
+Author: Jeremiah Nairn
+
+Description: Holds the outbound message queue that batches up draft messages for each channel,
+so a run of back to back picks goes out as a few messages instead of one per pick
+"""
+
+#imports
+import asyncio
+from collections import deque
+
+#how long (in seconds) messages are held so a burst can be sent together
+COALESCE_WINDOW_SECONDS = 0.75
+#discords limit on the length of a single message
+MAX_MESSAGE_LENGTH = 2000
+#how many messages can go to one channel in each rate limit period (discord allows 5 every 5 seconds)
+CHANNEL_RATE_LIMIT = 5
+CHANNEL_RATE_PERIOD_SECONDS = 5.0
+
+#the queue for a single channel
+class ChannelOutbox:
+    #constructor
+    def __init__(self, channel, window = COALESCE_WINDOW_SECONDS):
+        self.channel = channel
+        self.window = window
+        self.pending = deque() #messages waiting to go out, oldest on the left
+        self.sent_times = deque() #when recent messages went out (for the rate limit)
+        self.task = None #the task sending messages (only running while there is something to send)
+
+    #function to add a message to the queue
+    def put(self, text):
+        self.pending.append(text)
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self.run())
+
+    #function that sends messages until the queue is empty
+    async def run(self):
+        while self.pending:
+            #give the rest of a burst a moment to show up
+            await asyncio.sleep(self.window)
+            await self.wait_for_slot()
+            message = self.take_batch()
+            try:
+                await self.channel.send(message)
+            except Exception as e:
+                print(f"[OUTBOX] Error Sending to {getattr(self.channel, 'name', self.channel)}: {e}")
+
+    #function to take as many messages (in order) as fit in one discord message
+    def take_batch(self):
+        lines = [self.pending.popleft()]
+        size = len(lines[0])
+        while self.pending and size + 1 + len(self.pending[0]) <= MAX_MESSAGE_LENGTH:
+            text = self.pending.popleft()
+            lines.append(text)
+            size += 1 + len(text)
+        return "\n".join(lines)
+
+    #function that waits until the channel has room under its rate limit
+    async def wait_for_slot(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            while self.sent_times and now - self.sent_times[0] >= CHANNEL_RATE_PERIOD_SECONDS:
+                self.sent_times.popleft()
+            if len(self.sent_times) < CHANNEL_RATE_LIMIT:
+                self.sent_times.append(now)
+                return
+            await asyncio.sleep(self.sent_times[0] + CHANNEL_RATE_PERIOD_SECONDS - now)
+
+    #function that waits for everything queued so far to be sent
+    async def drain(self):
+        while self.task is not None and not self.task.done():
+            await asyncio.shield(self.task)
+
+class Outbox:
+    #constructor
+    def __init__(self, window = COALESCE_WINDOW_SECONDS):
+        self.window = window #how long each channel holds messages before sending them
+        self.channels = {} #channel id -> channel outbox
+
+    #function to queue a message for a channel
+    def send(self, channel, text):
+        box = self.channels.get(channel.id)
+        if box is None:
+            box = ChannelOutbox(channel, self.window)
+            self.channels[channel.id] = box
+        box.put(text)
+
+    #function that waits for a channels queue to empty out
+    async def drain(self, channel):
+        box = self.channels.get(channel.id)
+        if box is not None:
+            await box.drain()
+
+    #function to forget about a channel once its queue is empty (the draft is done with it)
+    def forget(self, channel):
+        box = self.channels.get(channel.id)
+        if box is not None and not box.pending and (box.task is None or box.task.done()):
+            del self.channels[channel.id]
+
+#the outbox shared by every draft
+outbox = Outbox()
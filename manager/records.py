@@ -0,0 +1,98 @@
+"""
+File: manager/records.py
+Author: Jeremiah Nairn
+
+Description: Holds the compact records used for drafters and teams inside of a draft
+"""
+
+#imports
+from collections import deque
+
+#how many picks a drafter can have waiting in their queue
+QUEUE_SIZE = 4
+
+#class for a single drafter
+class Player:
+    __slots__ = ("id", "user", "name", "position", "rounds", "queue", "double_pick")
+
+    #constructor
+    def __init__(self, id, user, name, round_limit, position = 0):
+        self.id = id #discord user id
+        self.user = user #discord username
+        self.name = name #discord nickname
+        self.position = position #draft position
+        self.rounds = [None] * round_limit #the team picked in each round (index 0 is round 1)
+        self.queue = deque(maxlen=QUEUE_SIZE) #picks waiting to be processed, next pick on the left
+        self.double_pick = False
+
+    #function to get the queue padded out to its full size with None
+    def queue_slots(self):
+        return list(self.queue) + [None] * (QUEUE_SIZE - len(self.queue))
+
+    #adapter so older code can keep reading a player like the old dict ("id", "round_3", "queue_1", ...)
+    def __getitem__(self, key):
+        if key.startswith("round_"):
+            index = int(key[6:]) - 1
+            if not 0 <= index < len(self.rounds):
+                raise KeyError(key)
+            return self.rounds[index]
+        if key.startswith("queue_"):
+            index = int(key[6:]) - 1
+            if not 0 <= index < QUEUE_SIZE:
+                raise KeyError(key)
+            return self.queue[index] if index < len(self.queue) else None
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    #adapter for dict style writes
+    def __setitem__(self, key, value):
+        if key.startswith("round_"):
+            index = int(key[6:]) - 1
+            if not 0 <= index < len(self.rounds):
+                raise KeyError(key)
+            self.rounds[index] = value
+        elif key.startswith("queue_"):
+            slots = self.queue_slots()
+            slots[int(key[6:]) - 1] = value
+            self.queue = deque((pick for pick in slots if pick is not None), maxlen=QUEUE_SIZE)
+        elif key in self.__slots__:
+            setattr(self, key, value)
+        else:
+            raise KeyError(key)
+
+    #adapter for dict style .get()
+    def get(self, key, default = None):
+        try:
+            return self[key]
+        except (KeyError, ValueError):
+            return default
+
+    #adapter for "key in player"
+    def __contains__(self, key):
+        return self.get(key, KeyError) is not KeyError
+
+#class for a single team that can be picked
+class Team:
+    __slots__ = ("team", "picks_remaining")
+
+    #constructor
+    def __init__(self, team, picks_remaining = 0):
+        self.team = team #team number
+        self.picks_remaining = picks_remaining or 0 #how many more drafters can pick this team
+
+    #adapter so older code can keep reading a team like the old dict ("team", "picks_remaining")
+    def __getitem__(self, key):
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    #adapter for dict style writes
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    #adapter for dict style .get()
+    def get(self, key, default = None):
+        return getattr(self, key) if key in self.__slots__ else default
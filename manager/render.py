@@ -0,0 +1,296 @@
+"""
+File: manager/render.py
+Author: Jeremiah Nairn
+
+Description: Holds the board renderer that draws the draft sheet as an image straight from the draft data
+"""
+
+#import libraries
+import io
+import os
+from collections import OrderedDict
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageFont, features
+
+#imports the board settings from the .env file
+from dotenv import load_dotenv
+load_dotenv()
+
+#the look of each kind of cell (colors are rgb, sizes are points), matches the styles in the excel sheet
+STYLES = {
+    "header": {"fill": (0x0F, 0x24, 0x3E), "color": (255, 255, 255), "family": "sans", "size": 12, "bold": True},
+    "body": {"fill": (0x0C, 0x0A, 0x0F), "color": (255, 255, 255), "family": "sans", "size": 12, "bold": False},
+}
+#the font files to try for each family, in order (regular, bold), windows fonts first then dejavu
+FONT_FILES = {
+    "sans": [("arial.ttf", "arialbd.ttf"), ("DejaVuSans.ttf", "DejaVuSans-Bold.ttf")],
+}
+#how many text measurements are remembered
+TEXT_METRICS_CACHE_SIZE = 4096
+BORDER_COLOR = (200, 200, 200)
+BACKGROUND_COLOR = (255, 255, 255)
+#column widths (in excel characters) and row height (in points), same as the excel sheet
+DRAFTER_COLUMN_WIDTH = 30
+ROUND_COLUMN_WIDTH = 15
+PLACE_COLUMN_WIDTH = 8
+POINTS_COLUMN_WIDTH = 12
+ROW_HEIGHT = 15
+#how many colors the encoded board uses (it only really has 4, the rest are for smooth text edges)
+PALETTE_COLORS = 16
+#the widest (in pixels) a single image can be, wider boards get split into several images (each with the drafter column)
+#(set BOARD_MAX_WIDTH in the .env file to change it)
+DEFAULT_MAX_IMAGE_WIDTH = 2048
+#how much memory (in bytes) the render cache can hold
+RENDER_CACHE_BYTES = 32 * 1024 * 1024
+#how many boards the renderer keeps the last image of for repainting (least recently drawn goes first)
+KEPT_BOARDS = 8
+#layout (in pixels)
+BORDER_PX = 1
+PAD_X = 8
+PAD_Y = 6
+
+#helper function to read the max image width from the .env file (a bad value falls back to the default instead of crashing)
+def read_max_image_width():
+    value = os.getenv("BOARD_MAX_WIDTH")
+    if not value:
+        return DEFAULT_MAX_IMAGE_WIDTH
+    try:
+        width = int(value)
+    except ValueError:
+        print(f"[RENDER] BOARD_MAX_WIDTH={value!r} is not a number, using {DEFAULT_MAX_IMAGE_WIDTH}.")
+        return DEFAULT_MAX_IMAGE_WIDTH
+    if width <= 0:
+        print(f"[RENDER] BOARD_MAX_WIDTH={value!r} must be above 0, using {DEFAULT_MAX_IMAGE_WIDTH}.")
+        return DEFAULT_MAX_IMAGE_WIDTH
+    return width
+
+MAX_IMAGE_WIDTH = read_max_image_width()
+
+#helper function that turns an excel column width into pixels
+def col_width_to_px(width):
+    return int(width * 7 + 5)
+
+#helper function that turns a row height in points into pixels (96dpi)
+def row_height_to_px(height):
+    return int(height * 96 / 72)
+
+#helper function to load a font (each family, size and weight is only loaded once for the whole process)
+@lru_cache(maxsize=None)
+def get_font(family, size, bold = False):
+    for regular, heavy in FONT_FILES.get(family, ()):
+        try:
+            return ImageFont.truetype(heavy if bold else regular, size)
+        except Exception:
+            continue
+    return ImageFont.load_default()
+
+#helper function to measure a piece of text in a font, returns (width, height)
+@lru_cache(maxsize=TEXT_METRICS_CACHE_SIZE)
+def measure_text(text, family, size, bold = False):
+    bbox = get_font(family, size, bold).getbbox(text)
+    return bbox[2] - bbox[0], bbox[3] - bbox[1]
+
+#helper function to load every font the styles use up front (so nothing gets loaded mid render)
+def preload_fonts():
+    for style in STYLES.values():
+        get_font(style["family"], style["size"], style["bold"])
+
+#helper function to pack the drafters into plain rows in draft order, (name, picks) or None for an empty position
+#(this is all the renderer needs, and it is small enough to hand to another process)
+def board_rows(draft_data, total_players):
+    rows = [None] * total_players
+    for drafter in draft_data:
+        if 0 <= drafter.position < total_players:
+            rows[drafter.position] = (drafter.name or "", tuple(drafter.rounds))
+    return tuple(rows)
+
+#helper function to get the column widths of the draft board
+def board_columns(rounds):
+    return [DRAFTER_COLUMN_WIDTH] + [ROUND_COLUMN_WIDTH] * rounds
+
+#helper function to get the column widths of the results table
+def standings_columns(rounds):
+    return [PLACE_COLUMN_WIDTH, DRAFTER_COLUMN_WIDTH, POINTS_COLUMN_WIDTH] + [ROUND_COLUMN_WIDTH] * rounds
+
+class BoardRenderer:
+    #constructor
+    def __init__(self, max_boards = KEPT_BOARDS):
+        self.max_boards = max_boards
+        self.boards = OrderedDict() #board key -> (cell table, layout, image) from the last time it was drawn
+
+    #function to get the text of every cell, with the style it is drawn in (row by row)
+    def cells(self, rows, rounds):
+        table = [[("Drafter", "header")] + [(f"Pick {round + 1}", "header") for round in range(rounds)]]
+        for drafter in rows:
+            if drafter is None:
+                table.append([("", "body")] * (rounds + 1))
+                continue
+            name, picks = drafter
+            row = [(name, "body")]
+            row.extend(("" if pick is None else str(pick), "body") for pick in picks[:rounds])
+            row.extend([("", "body")] * (rounds + 1 - len(row)))
+            table.append(row)
+        return table
+
+    #function to get the text of every cell of the results table, with the style it is drawn in
+    def standings_cells(self, standings, rounds):
+        table = [[("Place", "header"), ("Drafter", "header"), ("Points", "header")]
+                 + [(f"Pick {round + 1}", "header") for round in range(rounds)]]
+        for place, name, _, total, round_points in standings:
+            row = [(str(place), "body"), (name or "", "body"), (f"{total:.1f}", "body")]
+            row.extend((f"{points:.1f}", "body") for points in round_points[:rounds])
+            row.extend([("", "body")] * (rounds + 3 - len(row)))
+            table.append(row)
+        return table
+
+    #function to work out the pixel edges of every column and row (column widths are in excel characters, row count includes the header)
+    def layout(self, column_widths, row_count):
+        widths = [col_width_to_px(width) for width in column_widths]
+        heights = [row_height_to_px(ROW_HEIGHT)] * row_count
+        lefts = []
+        x = PAD_X
+        for width in widths:
+            lefts.append(x)
+            x += width + BORDER_PX
+        tops = []
+        y = PAD_Y
+        for height in heights:
+            tops.append(y)
+            y += height + BORDER_PX
+        size = (sum(widths) + (len(widths) + 1) * BORDER_PX + 2 * PAD_X,
+                sum(heights) + (len(heights) + 1) * BORDER_PX + 2 * PAD_Y)
+        return widths, heights, lefts, tops, size
+
+    #function to draw a single cell
+    def draw_cell(self, draw, box, text, style_name):
+        style = STYLES[style_name]
+        left, top, right, bottom = box
+        draw.rectangle(box, fill=style["fill"])
+        draw.rectangle(box, outline=BORDER_COLOR, width=BORDER_PX)
+        if not text:
+            return
+        font = get_font(style["family"], style["size"], style["bold"])
+        txt_w, txt_h = measure_text(text, style["family"], style["size"], style["bold"])
+        #everything is centered
+        draw.text((left + (right - left - txt_w) / 2, top + (bottom - top - txt_h) / 2), text, font=font, fill=style["color"])
+
+    #function to draw a whole table of cells onto a new image
+    def draw_table(self, table, layout):
+        widths, heights, lefts, tops, size = layout
+        img = Image.new("RGB", size, BACKGROUND_COLOR)
+        draw = ImageDraw.Draw(img)
+        for r, row in enumerate(table):
+            for c, (text, style_name) in enumerate(row):
+                box = (lefts[c], tops[r], lefts[c] + widths[c], tops[r] + heights[r])
+                self.draw_cell(draw, box, text, style_name)
+        return img
+
+    #function to draw the results table, returns a PIL image
+    def render_standings(self, standings, rounds):
+        table = self.standings_cells(standings, rounds)
+        return self.draw_table(table, self.layout(standings_columns(rounds), len(table)))
+
+    #function to draw the board, returns a PIL image
+    #if a key is given the last image for that key is kept, and only the cells that changed get repainted next time
+    def render(self, rows, rounds, key = None):
+        table = self.cells(rows, rounds)
+        last = self.boards.get(key) if key is not None else None
+        if last is not None and len(last[0]) == len(table) and len(last[0][0]) == len(table[0]):
+            old_table, (widths, heights, lefts, tops, size), img = last
+            draw = ImageDraw.Draw(img)
+            for r, row in enumerate(table):
+                old_row = old_table[r]
+                if row == old_row:
+                    continue
+                for c, cell in enumerate(row):
+                    if cell != old_row[c]:
+                        box = (lefts[c], tops[r], lefts[c] + widths[c], tops[r] + heights[r])
+                        self.draw_cell(draw, box, *cell)
+        else:
+            widths, heights, lefts, tops, size = self.layout(board_columns(rounds), len(table))
+            img = self.draw_table(table, (widths, heights, lefts, tops, size))
+        if key is not None:
+            self.boards[key] = (table, (widths, heights, lefts, tops, size), img)
+            self.boards.move_to_end(key)
+            while len(self.boards) > self.max_boards:
+                self.boards.popitem(last=False)
+        return img
+
+    #function to split a rendered table into tiles no wider than MAX_IMAGE_WIDTH, cut between columns
+    #(the first keep columns, the drafter column on the board, go on every tile)
+    def tiles(self, img, column_widths, row_count, keep = 1):
+        if img.width <= MAX_IMAGE_WIDTH:
+            return [img]
+        widths, heights, lefts, tops, size = self.layout(column_widths, row_count)
+        name_width = lefts[keep]
+        room = MAX_IMAGE_WIDTH - name_width - PAD_X
+        tiles = []
+        start = keep
+        while start < len(widths):
+            end = start + 1
+            while end < len(widths) and lefts[end] + widths[end] + BORDER_PX - lefts[start] <= room:
+                end += 1
+            right = lefts[end - 1] + widths[end - 1] + BORDER_PX
+            tile = Image.new("RGB", (name_width + right - lefts[start] + PAD_X, img.height), BACKGROUND_COLOR)
+            tile.paste(img.crop((0, 0, name_width, img.height)), (0, 0))
+            tile.paste(img.crop((lefts[start], 0, right, img.height)), (name_width, 0))
+            tiles.append(tile)
+            start = end
+        return tiles
+
+    #function to encode one image, palette png or lossless webp (whichever is smaller), returns (extension, bytes)
+    def encode_image(self, img):
+        paletted = img.quantize(colors=PALETTE_COLORS)
+        buffer = io.BytesIO()
+        paletted.save(buffer, format="PNG", optimize=True)
+        best = ("png", buffer.getvalue())
+        if features.check("webp"):
+            buffer = io.BytesIO()
+            paletted.save(buffer, format="WEBP", lossless=True, method=4)
+            if len(buffer.getvalue()) < len(best[1]):
+                best = ("webp", buffer.getvalue())
+        return best
+
+    #function to turn a rendered table into encoded images, returns a tuple of (extension, bytes)
+    def encode(self, img, column_widths, row_count, keep = 1):
+        return tuple(self.encode_image(tile) for tile in self.tiles(img, column_widths, row_count, keep))
+
+#helper function to get how many bytes a set of encoded images takes up
+def payload_size(images):
+    return sum(len(data) for _, data in images)
+
+#cache of encoded board images, keyed by draft and the drafts version (least recently used goes first)
+class RenderCache:
+    #constructor
+    def __init__(self, max_bytes = RENDER_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict() #(draft name, version) -> encoded image
+        self.size = 0 #bytes currently held
+
+    #function to get an image (None if it isnt cached)
+    def get(self, name, version):
+        data = self.entries.get((name, version))
+        if data is not None:
+            self.entries.move_to_end((name, version))
+        return data
+
+    #function to add an image, older versions of the same draft are dropped since they cant be asked for again
+    def put(self, name, version, data):
+        for key in [key for key in self.entries if key[0] == name and key[1] != version]:
+            self.size -= payload_size(self.entries.pop(key))
+        old = self.entries.pop((name, version), None)
+        if old is not None:
+            self.size -= payload_size(old)
+        if payload_size(data) > self.max_bytes:
+            return
+        self.entries[(name, version)] = data
+        self.size += payload_size(data)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= payload_size(evicted)
+
+#the renderer shared by every draft
+preload_fonts()
+renderer = BoardRenderer()
+#the cache shared by every draft
+render_cache = RenderCache()
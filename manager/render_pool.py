@@ -0,0 +1,150 @@
+"""
+File: manager/render_pool.py
+Author: Jeremiah Nairn
+
+Description: Holds the worker process pool that draws board images and writes excel exports,
+so the drawing never holds up the bots event loop
+"""
+
+#imports
+import asyncio
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from manager.records import Player
+from manager.render import renderer, render_cache, board_rows, board_columns
+from manager.excel import ExcelManager, save_debug_copy
+
+#how many worker processes to use (each draft always goes to the same one, so it can keep its last image)
+RENDER_WORKERS = max(1, min(4, (os.cpu_count() or 1) - 1))
+#how many jobs can be waiting at once before new ones are turned away
+MAX_PENDING_JOBS = 32
+
+#raised when there are too many jobs waiting
+class RenderQueueFull(Exception):
+    pass
+
+#raised when a worker couldnt finish a job (the worker crashed, or the job itself failed)
+class RenderFailed(Exception):
+    pass
+
+#runs in a worker: draws a board and returns the encoded images, a tuple of (extension, bytes)
+def render_job(key, rows, rounds):
+    return renderer.encode(renderer.render(rows, rounds, key=key), board_columns(rounds), len(rows) + 1)
+
+#runs in a worker: draws the results table and returns the encoded images, a tuple of (extension, bytes)
+def results_job(filename, standings, rounds):
+    return ExcelManager(filename, [], rounds, 0).get_results_as_image(standings)
+
+#runs in a worker: builds the excel sheet for a board (and its results if it has been scored) and returns it as xlsx bytes
+def export_job(filename, rows, rounds, standings = None):
+    players = []
+    for position, row in enumerate(rows):
+        if row is None:
+            continue
+        name, picks = row
+        player = Player(None, None, name, rounds, position)
+        player.rounds = list(picks)
+        players.append(player)
+    return ExcelManager(filename, players, rounds, len(rows)).export_excel(standings)
+
+class RenderPool:
+    #constructor
+    def __init__(self, workers = RENDER_WORKERS, max_pending = MAX_PENDING_JOBS):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.shards = [None] * workers #one single process executor per shard (started when first needed)
+        self.pending = {} #job key -> future, so the same job is only ever run once at a time
+
+    #function to get the shard a board is drawn on
+    def shard_for(self, name):
+        return zlib.crc32(name.encode("utf-8")) % self.workers
+
+    #function to get (or start) the executor for a shard
+    def executor(self, index):
+        if self.shards[index] is None:
+            #spawn so the workers dont inherit the bots threads and sockets
+            self.shards[index] = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        return self.shards[index]
+
+    #function to run a job on a boards shard (identical jobs that are already waiting share one result)
+    async def submit(self, job_key, name, function, *args):
+        future = self.pending.get(job_key)
+        if future is None:
+            if len(self.pending) >= self.max_pending:
+                raise RenderQueueFull(f"{len(self.pending)} jobs waiting")
+            index = self.shard_for(name)
+            loop = asyncio.get_running_loop()
+            executor = self.executor(index)
+            try:
+                future = loop.run_in_executor(executor, function, *args)
+            except BrokenProcessPool:
+                #the worker died since its last job, start a fresh one and try again
+                print(f"[RENDER] Worker {index} Was Broken, Restarting It.")
+                self.restart(index, executor)
+                executor = self.executor(index)
+                future = loop.run_in_executor(executor, function, *args)
+            self.pending[job_key] = future
+            future.add_done_callback(lambda done: self.finished(job_key, index, executor, done))
+        #shield it so one caller giving up doesnt cancel the job for everyone else
+        try:
+            return await asyncio.shield(future)
+        except BrokenProcessPool as e:
+            raise RenderFailed(f"render worker crashed: {e}") from e
+        except Exception as e:
+            raise RenderFailed(f"{function.__name__} failed: {e!r}") from e
+
+    #function to throw away a shards executor so a new one is started next time (only if it is still the current one)
+    def restart(self, index, executor):
+        if self.shards[index] is executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.shards[index] = None
+
+    #function that gets called when a job is done
+    def finished(self, job_key, index, executor, future):
+        if self.pending.get(job_key) is future:
+            del self.pending[job_key]
+        #a worker that died takes its executor with it, start a new one next time
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            print(f"[RENDER] Worker {index} Crashed, Restarting It.")
+            self.restart(index, executor)
+
+    #function to get the board images for a draft, a tuple of (extension, bytes)
+    async def render_board(self, draft_instance):
+        key = draft_instance.excel_manager.filename
+        version = draft_instance.version
+        cached = render_cache.get(key, version)
+        if cached is not None:
+            return cached
+        rows = board_rows(draft_instance.draft_data, draft_instance.total_participants)
+        data = await self.submit(("board", key, version), key, render_job, key, rows, draft_instance.round_limit)
+        render_cache.put(key, version, data)
+        for index, (extension, image) in enumerate(data):
+            save_debug_copy(f"{key}_{index + 1}.{extension}", image)
+        return data
+
+    #function to build the excel sheet for a draft, returns it as xlsx bytes
+    async def export_workbook(self, draft_instance):
+        key = draft_instance.excel_manager.filename
+        rows = board_rows(draft_instance.draft_data, draft_instance.total_participants)
+        standings = draft_instance.standings
+        return await self.submit(("xlsx", key, draft_instance.version, standings), key, export_job,
+                                 key, rows, draft_instance.round_limit, standings)
+
+    #function to get the results table for a scored draft, a tuple of (extension, bytes)
+    async def render_results(self, draft_instance):
+        key = draft_instance.excel_manager.filename
+        standings = draft_instance.standings
+        return await self.submit(("results", key, standings), key, results_job, key, standings, draft_instance.round_limit)
+
+    #function to stop every worker
+    def shutdown(self):
+        for index, executor in enumerate(self.shards):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+                self.shards[index] = None
+
+#the pool shared by every draft
+render_pool = RenderPool()
@@ -0,0 +1,153 @@
+"""
+File: manager/request_scheduler.py
+Author: Jeremiah Nairn
+
+Description: Holds the process-wide scheduler that every Robotevents request goes through
+(rate limiting, priorities, retries and backoff)
+"""
+
+#imports
+import asyncio
+import heapq
+import itertools
+import random
+import time
+import aiohttp
+from email.utils import parsedate_to_datetime
+
+#how many requests per second are allowed on average
+REQUESTS_PER_SECOND = 4
+#how many requests can go out back to back before the rate kicks in
+BURST_SIZE = 8
+#how many times a failed request is retried before giving up
+MAX_RETRIES = 5
+#backoff bounds (in seconds) for retries
+BASE_BACKOFF_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 30
+
+#priority lanes (lower goes first)
+PRIORITY_INTERACTIVE = 0 #someone is waiting on a slash command for this
+PRIORITY_BACKGROUND = 1 #startup restores and other work nobody is watching
+
+#error raised when a request cant be completed
+class RobotEventsError(Exception):
+    pass
+
+#helper function to turn a Retry-After header into seconds (returns None if its missing or unreadable)
+def parse_retry_after(value):
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class RequestScheduler:
+    #constructor
+    def __init__(self, rate = REQUESTS_PER_SECOND, burst = BURST_SIZE, max_retries = MAX_RETRIES,
+                 base_backoff = BASE_BACKOFF_SECONDS, max_backoff = MAX_BACKOFF_SECONDS):
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        #token bucket
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        #nothing is sent before this time (set when the api tells us to slow down)
+        self.paused_until = 0.0
+        #requests waiting for a token, as a heap of (priority, order, future)
+        self.waiters = []
+        self.order = itertools.count()
+        self.pump_task = None
+
+    #function to top the bucket back up based on how much time has passed
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    #function to stop all requests for a while (used for 429s)
+    def pause(self, seconds):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    #function that returns a jittered exponential backoff for the given attempt
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * (2 ** attempt)))
+
+    #function that waits until a request in the given lane is allowed to go out
+    async def acquire(self, priority = PRIORITY_INTERACTIVE):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self.order), future))
+        #start handing out tokens if nothing is doing it already
+        if self.pump_task is None or self.pump_task.done():
+            self.pump_task = asyncio.ensure_future(self.pump())
+        await future
+
+    #function that hands tokens to the waiting requests, highest priority first
+    async def pump(self):
+        while self.waiters:
+            #throw away requests that were cancelled while waiting
+            if self.waiters[0][2].done():
+                heapq.heappop(self.waiters)
+                continue
+            now = time.monotonic()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+            self.refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                heapq.heappop(self.waiters)[2].set_result(None)
+                continue
+            #wait for the next token to come in
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    #function to send a request through the scheduler, retrying throttles and server errors
+    async def request(self, session, method, url, priority = PRIORITY_INTERACTIVE, **kwargs):
+        '''
+        sends a request once a token is available and returns (status, headers, json)
+
+        429s pause every request for Retry-After (or a backoff), 5xx and connection
+        errors are retried with jittered exponential backoff, and a 304 comes back
+        with no body
+
+        :raises RobotEventsError: if the request still fails after every retry
+        '''
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(priority)
+            try:
+                async with session.request(method, url, **kwargs) as response:
+                    status = response.status
+                    if status == 429 or status >= 500:
+                        if attempt == self.max_retries:
+                            raise RobotEventsError(f"{method} {url} failed with {status} after {attempt + 1} attempts")
+                        delay = parse_retry_after(response.headers.get("Retry-After"))
+                        if delay is None:
+                            delay = self.backoff(attempt)
+                        print(f"[SCHEDULER] {status} from {url}, retrying in {delay:.1f}s.")
+                        if status == 429:
+                            #throttling applies to everyone, so hold the whole queue
+                            self.pause(delay)
+                        else:
+                            await asyncio.sleep(delay)
+                        continue
+                    if status == 304:
+                        return status, response.headers, None
+                    if status >= 400:
+                        raise RobotEventsError(f"{method} {url} failed with {status}")
+                    data = await response.json(content_type=None)
+                    return status, response.headers, data
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise RobotEventsError(f"{method} {url} failed after {attempt + 1} attempts: {e}") from e
+                delay = self.backoff(attempt)
+                print(f"[SCHEDULER] {type(e).__name__} from {url}, retrying in {delay:.1f}s.")
+                await asyncio.sleep(delay)
+
+#the scheduler shared by the whole bot
+scheduler = RequestScheduler()
@@ -5,56 +5,193 @@ Author: Jeremiah Nairn
 Description: Holds all of the functionality related to the Robotevents API
 """
 
+#imports robotevents base url from the .env file (point it at the stand-in server for offline testing)
+import os
+from dotenv import load_dotenv
+load_dotenv()
+
 #base url for the robotevents api
-BASE_URL = "https://www.robotevents.com/api/v2"
+BASE_URL = os.getenv("ROBOTEVENTS_BASE_URL", "https://www.robotevents.com/api/v2").rstrip("/")
+#the most teams the api will hand back on a single page
+TEAMS_PER_PAGE = 250
+#the most pages that will be requested at the same time
+MAX_CONCURRENT_PAGES = 8
+#how long (in seconds) a single request can take before it is abandoned
+REQUEST_TIMEOUT_SECONDS = 30
+#how long (in seconds) an idle connection is kept open for reuse
+KEEPALIVE_SECONDS = 60
 
 #imports
-import requests
+import asyncio
+import aiohttp
+from manager.event_cache import get_cache, conditional_headers
+from manager.request_scheduler import scheduler, RobotEventsError, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+
+#the session shared by every robotevents request (created on first use, inside the event loop)
+_session = None
+
+#function to get the shared session, making it if it doesnt exist yet
+def get_session():
+    global _session
+    if _session is None or _session.closed:
+        #no connection cap here, the request scheduler is the only thing that throttles requests
+        #(a cap would quietly queue requests inside aiohttp, ignoring their priority)
+        connector = aiohttp.TCPConnector(limit=0, keepalive_timeout=KEEPALIVE_SECONDS)
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)
+        _session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+    return _session
+
+#function to close the shared session (used when the bot shuts down)
+async def close_session():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
 
 class Robotevent:
     #constructor
-    def __init__(self, name, sku, token):
+    def __init__(self, name, sku, token, max_concurrent_pages = MAX_CONCURRENT_PAGES, refresh = False,
+                 priority = PRIORITY_INTERACTIVE):
         #set the variables
         self.event_sku = sku
         self.api_token = token
         self.event_name = name
-        #get the events id
-        self.event_id = self.get_event_id()
+        self.refresh = refresh #if true, the cache is skipped and the api is always asked
+        self.max_concurrent_pages = max(1, max_concurrent_pages)
+        self.priority = priority #which scheduler lane this objects requests go in
+        self.headers = {
+            "Authorization": f"Bearer {self.api_token}",
+            "Accept": "application/json"
+            }
+        #the event id is looked up the first time its needed
+        self.event_id = None
+
+    #helper function that sends a single get request through the scheduler and returns (status, headers, json)
+    async def get(self, url, params = None, headers = None):
+        request_headers = dict(self.headers)
+        request_headers.update(headers or {})
+        return await scheduler.request(get_session(), "GET", url, priority=self.priority,
+                                       params=params, headers=request_headers)
 
     #access the event through the API
 
-    def get_event_id(self):
+    async def get_event_id(self):
+        #use the cached event id if it is still fresh
+        cache = get_cache()
+        cached = cache.get("event", self.event_sku)
+        if not self.refresh and cache.is_fresh(cached):
+            self.event_id = cached["value"]
+            return self.event_id
         #json request parameters
-        url = "https://www.robotevents.com/api/v2/events"
-        params = {"sku": {self.event_sku}}
-        headers = {
-            "Authorization": f"Bearer {self.api_token}",
-            "Accept": "application/json"
-            }
+        url = f"{BASE_URL}/events"
+        params = {"sku": self.event_sku}
+        headers = {} if self.refresh else conditional_headers(cached)
         #get a response from the api, and get the event id from the event sku
-        response = requests.get(url, headers=headers, params=params)
-        data = response.json()
+        status, response_headers, data = await self.get(url, params, headers)
+        #nothing changed since we last asked, so keep the cached id
+        if status == 304 and cached is not None:
+            cache.touch("event", self.event_sku)
+            self.event_id = cached["value"]
+            return self.event_id
         #pull the event id
+        if not data or not data.get("data"):
+            raise RobotEventsError(f"No event found for sku {self.event_sku}")
         event_id = data["data"][0]["id"]
+        cache.put("event", self.event_sku, event_id,
+                  response_headers.get("ETag"), response_headers.get("Last-Modified"))
         print(f"[ROBOTEVENTS] [FROM {(self.event_name).upper()}] Event ID Acquired: {event_id}")
+        self.event_id = event_id
         return event_id
 
-    def get_teams_from_event(self):
-        #get the list of teams
+    #helper function that requests pages 2 through last_page of a list at the same time (capped by a semaphore)
+    #and returns them in order (the first page is always fetched on its own, since it says how many pages there are)
+    async def get_rest_of_pages(self, url, params, last_page):
+        if last_page <= 1:
+            return []
+        limiter = asyncio.Semaphore(self.max_concurrent_pages)
+        async def limited_page(page):
+            async with limiter:
+                return (await self.get(url, dict(params, page=page)))[2] or {}
+        tasks = [asyncio.ensure_future(limited_page(page)) for page in range(2, last_page + 1)]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            #if one page fails (or we get cancelled), dont leave the others running
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def get_teams_from_event(self):
+        #make sure we know which event we are looking at
+        if self.event_id is None:
+            await self.get_event_id()
+        #use the cached team list if it is still fresh
+        cache = get_cache()
+        cached = cache.get("teams", self.event_id)
+        if not self.refresh and cache.is_fresh(cached):
+            return cached["value"]
+        #request the first page, which also tells us how many pages there are
+        url = f"{BASE_URL}/events/{self.event_id}/teams"
+        params = {"per_page": TEAMS_PER_PAGE}
+        headers = {} if self.refresh else conditional_headers(cached)
+        status, response_headers, first_page = await self.get(url, dict(params, page=1), headers)
+        #the first page hasnt changed, so neither has the team list
+        if status == 304 and cached is not None:
+            cache.touch("teams", self.event_id)
+            print(f"[ROBOTEVENTS] [FROM {(self.event_name).upper()}] Cached Teams for {self.event_id} are Still Valid.")
+            return cached["value"]
+        last_page = first_page.get("meta", {}).get("last_page", 1) or 1
+        #fetch the rest of the pages at the same time
+        pages = [first_page] + await self.get_rest_of_pages(url, params, last_page)
+        #extract team numbers (gather keeps the pages in order)
         teams = []
-        #json request parameters
-        for page in range(31):
-            url = f"{BASE_URL}/events/{self.event_id}/teams?page={page+1}"
-            headers = {
-                "Authorization": f"Bearer {self.api_token}",
-                "Accept": "application/json"
-                }
-            #request the data
-            response = requests.get(url, headers=headers)
-            data = response.json()
-            #extract team numbers
+        for data in pages:
             teams += [team["number"] for team in data.get("data", [])]
-        print(f"[ROBOTEVENTS] [FROM {(self.event_name).upper()}] Teams Acquired from {self.event_id}.")
+        #remember the list (and how to revalidate it) for next time
+        cache.put("teams", self.event_id, teams,
+                  response_headers.get("ETag"), response_headers.get("Last-Modified"))
+        print(f"[ROBOTEVENTS] [FROM {(self.event_name).upper()}] {len(teams)} Teams Acquired from {self.event_id} ({last_page} page(s)).")
         #return the teams
         return teams
 
+    #helper function that requests every page of a list from the api and returns all of the items
+    async def get_all_pages(self, url, params = None):
+        params = dict(params or {})
+        params["per_page"] = TEAMS_PER_PAGE
+        first_page = (await self.get(url, dict(params, page=1)))[2] or {}
+        last_page = first_page.get("meta", {}).get("last_page", 1) or 1
+        pages = [first_page] + await self.get_rest_of_pages(url, params, last_page)
+        items = []
+        for data in pages:
+            items += data.get("data", [])
+        return items
+
+    #function to get the ids of the divisions at the event
+    async def get_event_divisions(self):
+        if self.event_id is None:
+            await self.get_event_id()
+        status, response_headers, data = await self.get(f"{BASE_URL}/events/{self.event_id}")
+        return [division["id"] for division in (data or {}).get("divisions", [])]
+
+    #function to get everything the scoring system needs from the event (results change, so nothing here is cached)
+    #returns a dict with the "rankings", "skills" and "matches" lists straight from the api
+    async def get_event_results(self):
+        divisions = await self.get_event_divisions()
+        base = f"{BASE_URL}/events/{self.event_id}"
+        rankings, matches, skills = await asyncio.gather(
+            asyncio.gather(*(self.get_all_pages(f"{base}/divisions/{division}/rankings") for division in divisions)),
+            asyncio.gather(*(self.get_all_pages(f"{base}/divisions/{division}/matches") for division in divisions)),
+            self.get_all_pages(f"{base}/skills"),
+        )
+        #make sure every ranking says which division it came from (ranks are only comparable inside of a division)
+        for division, division_rankings in zip(divisions, rankings):
+            for ranking in division_rankings:
+                ranking.setdefault("division", {"id": division})
+        results = {
+            "rankings": [ranking for division in rankings for ranking in division],
+            "matches": [match for division in matches for match in division],
+            "skills": skills,
+        }
+        print(f"[ROBOTEVENTS] [FROM {(self.event_name).upper()}] Results Acquired from {self.event_id} "
+              f"({len(results['rankings'])} rankings, {len(results['matches'])} matches, {len(skills)} skills).")
+        return results
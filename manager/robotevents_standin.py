@@ -0,0 +1,321 @@
+"""
+File: manager/robotevents_standin.py
+Author: Jeremiah Nairn
+
+Description: Local stand-in for the Robotevents API that replays recorded fixtures, used to test and
+benchmark the bot without a network connection or a real token
+
+usage:
+    python -m manager.robotevents_standin serve [--port 8765] [--latency-ms 80] [--error-rate 0.05] ...
+    python -m manager.robotevents_standin record RE-VRC-XX-XXXX   (needs ROBOTEVENTS_TOKEN)
+    python -m manager.robotevents_standin bench --sku RE-STANDIN-00-0001 --drafts 20 [--results]
+
+fixtures that were recorded without results (or made up with --synthetic-teams) get made up divisions,
+rankings, matches and skills so the scoring commands can be tested too
+
+then set ROBOTEVENTS_BASE_URL=http://127.0.0.1:8765/api/v2 in the .env file to point the bot at it
+"""
+
+#imports
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from aiohttp import web
+
+#where the recorded responses are kept
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "robotevents")
+#the real api (only used when recording)
+LIVE_BASE_URL = "https://www.robotevents.com/api/v2"
+
+#function to load every fixture in the folder, keyed by sku
+def load_fixtures(folder = FIXTURE_DIR):
+    fixtures = {}
+    if not os.path.isdir(folder):
+        return fixtures
+    for file in sorted(os.listdir(folder)):
+        if file.endswith(".json"):
+            with open(os.path.join(folder, file), "r", encoding="utf-8") as fixture_file:
+                fixture = json.load(fixture_file)
+            fixtures[fixture["event"]["sku"]] = with_results(fixture)
+    return fixtures
+
+#function to make a fake event with a given amount of teams (for testing big divisions)
+def synthetic_fixture(team_count, event_id = 900000):
+    sku = f"RE-STANDIN-SYNTH-{team_count}"
+    teams = [{"id": 800000 + i, "number": f"{1000 + i // 4}{'ABCD'[i % 4]}", "team_name": f"Stand-in Team {i + 1}",
+              "organization": "Stand-in", "grade": "High School"} for i in range(team_count)]
+    return with_results({"event": {"id": event_id, "sku": sku, "name": f"Stand-in Event ({team_count} teams)"}, "teams": teams})
+
+#helper function that turns a team from the teams list into the short form used by rankings, matches and skills
+def team_ref(team):
+    return {"team": {"id": team["id"], "name": team["number"]}}
+
+#function to make up results for a fixture that doesnt have any (the same fixture always gets the same results)
+#teams are dealt into divisions, ranked by a made up strength, and the top 8 of each division play out a bracket
+def with_results(fixture, teams_per_division = 60):
+    if "rankings" in fixture:
+        return fixture
+    rng = random.Random(fixture["event"]["id"])
+    teams = fixture["teams"]
+    division_count = max(1, -(-len(teams) // teams_per_division))
+    divisions = [{"id": i + 1, "name": f"Division {i + 1}", "order": i + 1} for i in range(division_count)]
+    rankings, matches, skills = [], [], []
+    for division in divisions:
+        division_ref = {"id": division["id"], "name": division["name"]}
+        seeded = sorted(teams[division["id"] - 1::division_count], key=lambda team: -rng.random())
+        for rank, team in enumerate(seeded, 1):
+            wins = max(0, 10 - rank // 2 - rng.randint(0, 2))
+            ties = rng.randint(0, 1)
+            rankings.append(dict(team_ref(team), division=division_ref, rank=rank, wins=wins, losses=10 - wins - ties,
+                                 ties=ties, wp=2 * wins + ties, ap=rng.randint(0, 60), sp=rng.randint(100, 900)))
+        #alliances are made of the seeds next to each other, 1+2 plays 7+8 and 3+4 plays 5+6, the better alliance always wins
+        alliances = [seeded[i:i + 2] for i in range(0, min(len(seeded), 8), 2)]
+        def play(round_number, matchnum, red, blue):
+            red_score, blue_score = rng.randint(120, 200), rng.randint(40, 119)
+            matches.append({"id": len(matches) + 1, "event": {"id": fixture["event"]["id"]}, "division": division_ref,
+                            "round": round_number, "instance": 1, "matchnum": matchnum, "scored": True,
+                            "alliances": [{"color": "red", "score": red_score, "teams": [team_ref(team) for team in red]},
+                                          {"color": "blue", "score": blue_score, "teams": [team_ref(team) for team in blue]}]})
+            return red
+        if len(alliances) == 4:
+            finalists = [play(4, 1, alliances[0], alliances[3]), play(4, 2, alliances[1], alliances[2])]
+            play(5, 1, *finalists)
+        elif len(alliances) >= 2:
+            play(5, 1, alliances[0], alliances[1])
+    for team in teams:
+        for skills_type in ("driver", "programming"):
+            skills.append(dict(team_ref(team), type=skills_type, score=rng.randint(0, 100)))
+    fixture = dict(fixture, rankings=rankings, matches=matches, skills=skills)
+    fixture["event"] = dict(fixture["event"], divisions=divisions)
+    return fixture
+
+#helper function that builds a robotevents style paginated body
+def paginate(items, page, per_page, path):
+    total = len(items)
+    last_page = max(1, -(-total // per_page))
+    start = (page - 1) * per_page
+    return {
+        "meta": {"current_page": page, "last_page": last_page, "per_page": per_page, "total": total,
+                 "from": start + 1 if start < total else None, "to": min(start + per_page, total) if start < total else None,
+                 "path": path},
+        "data": items[start:start + per_page]
+    }
+
+class StandinServer:
+    #constructor
+    def __init__(self, fixtures, latency_ms = 0, jitter_ms = 0, max_per_page = 250, error_rate = 0.0,
+                 burst_every = 0, burst_length = 0, retry_after = 1):
+        self.fixtures = fixtures
+        self.events_by_id = {fixture["event"]["id"]: fixture for fixture in fixtures.values()}
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.max_per_page = max_per_page
+        self.error_rate = error_rate
+        self.burst_every = burst_every #every this many requests, start a burst of 429s
+        self.burst_length = burst_length #how many requests in a row get a 429
+        self.retry_after = retry_after
+        self.request_count = 0
+        self.status_counts = {}
+
+    #helper function that sends json with an etag, or a 304 if the client already has it
+    def respond(self, request, body):
+        text = json.dumps(body)
+        etag = '"' + hashlib.sha1(text.encode("utf-8")).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(text=text, content_type="application/json", headers={"ETag": etag})
+
+    #middleware that adds the latency, errors and 429 bursts to every request
+    @web.middleware
+    async def faults(self, request, handler):
+        self.request_count += 1
+        count = self.request_count
+        if self.latency_ms or self.jitter_ms:
+            await asyncio.sleep((self.latency_ms + random.uniform(0, self.jitter_ms)) / 1000)
+        if self.burst_every and self.burst_length and (count - 1) % self.burst_every < self.burst_length:
+            response = web.json_response({"code": 429, "message": "Too Many Requests"}, status=429,
+                                         headers={"Retry-After": str(self.retry_after)})
+        elif self.error_rate and random.random() < self.error_rate:
+            response = web.json_response({"code": 503, "message": "Service Unavailable"}, status=503)
+        else:
+            response = await handler(request)
+        self.status_counts[response.status] = self.status_counts.get(response.status, 0) + 1
+        return response
+
+    #GET /events?sku=...
+    async def events(self, request):
+        skus = request.query.getall("sku", []) + request.query.getall("sku[]", [])
+        events = [self.fixtures[sku]["event"] for sku in skus if sku in self.fixtures]
+        page, per_page = self.page_args(request)
+        return self.respond(request, paginate(events, page, per_page, str(request.url.with_query(None))))
+
+    #GET /events/{id}/teams?page=...&per_page=...
+    async def teams(self, request):
+        fixture = self.events_by_id.get(int(request.match_info["event_id"]))
+        if fixture is None:
+            return web.json_response({"code": 404, "message": "Not Found"}, status=404)
+        page, per_page = self.page_args(request)
+        return self.respond(request, paginate(fixture["teams"], page, per_page, str(request.url.with_query(None))))
+
+    #GET /events/{id} (the event, with its divisions)
+    async def event(self, request):
+        fixture = self.events_by_id.get(int(request.match_info["event_id"]))
+        if fixture is None:
+            return web.json_response({"code": 404, "message": "Not Found"}, status=404)
+        return self.respond(request, fixture["event"])
+
+    #GET /events/{id}/divisions/{division_id:\d+}/rankings and .../matches
+    async def division_list(self, request):
+        fixture = self.events_by_id.get(int(request.match_info["event_id"]))
+        if fixture is None:
+            return web.json_response({"code": 404, "message": "Not Found"}, status=404)
+        division_id = int(request.match_info["division_id"])
+        items = [item for item in fixture[request.match_info["kind"]] if item["division"]["id"] == division_id]
+        page, per_page = self.page_args(request)
+        return self.respond(request, paginate(items, page, per_page, str(request.url.with_query(None))))
+
+    #GET /events/{id}/skills
+    async def skills(self, request):
+        fixture = self.events_by_id.get(int(request.match_info["event_id"]))
+        if fixture is None:
+            return web.json_response({"code": 404, "message": "Not Found"}, status=404)
+        page, per_page = self.page_args(request)
+        return self.respond(request, paginate(fixture["skills"], page, per_page, str(request.url.with_query(None))))
+
+    #helper function that reads the page and per_page query values
+    def page_args(self, request):
+        try:
+            page = max(1, int(request.query.get("page", 1)))
+            per_page = int(request.query.get("per_page", 25))
+        except ValueError:
+            page, per_page = 1, 25
+        return page, max(1, min(per_page, self.max_per_page))
+
+    #function to build the aiohttp app
+    def make_app(self):
+        app = web.Application(middlewares=[self.faults])
+        app.router.add_get("/api/v2/events", self.events)
+        app.router.add_get(r"/api/v2/events/{event_id:\d+}", self.event)
+        app.router.add_get(r"/api/v2/events/{event_id:\d+}/teams", self.teams)
+        app.router.add_get(r"/api/v2/events/{event_id:\d+}/divisions/{division_id:\d+}/{kind:rankings|matches}", self.division_list)
+        app.router.add_get(r"/api/v2/events/{event_id:\d+}/skills", self.skills)
+        return app
+
+#function to record a live event (and its results so far) into a fixture file
+async def record(sku, token, folder = FIXTURE_DIR):
+    import aiohttp
+    headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+    async with aiohttp.ClientSession(headers=headers) as session:
+        #helper function that gets every page of a list
+        async def get_all(url):
+            items = []
+            page, last_page = 1, 1
+            while page <= last_page:
+                async with session.get(url, params={"page": page, "per_page": 250}) as response:
+                    data = await response.json()
+                items += data.get("data", [])
+                last_page = data.get("meta", {}).get("last_page", 1) or 1
+                page += 1
+            return items
+        async with session.get(f"{LIVE_BASE_URL}/events", params={"sku": sku}) as response:
+            event = (await response.json())["data"][0]
+        base = f"{LIVE_BASE_URL}/events/{event['id']}"
+        teams = await get_all(f"{base}/teams")
+        rankings, matches = [], []
+        for division in event.get("divisions", []):
+            #the api doesnt always say which division a ranking is from, the stand-in needs it to filter them
+            for ranking in await get_all(f"{base}/divisions/{division['id']}/rankings"):
+                ranking.setdefault("division", {"id": division["id"], "name": division.get("name")})
+                rankings.append(ranking)
+            matches += await get_all(f"{base}/divisions/{division['id']}/matches")
+        skills = await get_all(f"{base}/skills")
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{sku}.json")
+    with open(path, "w", encoding="utf-8") as fixture_file:
+        json.dump({"event": event, "teams": teams, "rankings": rankings, "matches": matches, "skills": skills},
+                  fixture_file, indent=1)
+    print(f"[STANDIN] Recorded {sku} ({len(teams)} teams, {len(rankings)} rankings, {len(matches)} matches, "
+          f"{len(skills)} skills) to {path}")
+
+#function to time how long it takes to load the teams (or the results) for a batch of drafts
+async def bench(base_url, sku, drafts, cold, results = False):
+    #point the client at the stand-in and give it a throwaway cache
+    from manager import robotevents_handler
+    from manager.event_cache import EventCache, set_cache
+    robotevents_handler.BASE_URL = base_url.rstrip("/")
+    set_cache(EventCache(":memory:"))
+    async def load(i):
+        api = robotevents_handler.Robotevent(f"bench {i}", sku, "standin-token", refresh=cold)
+        if results:
+            return await api.get_event_results()
+        return await api.get_teams_from_event()
+    #the session has to be closed however the run ends, or aiohttp warns about it on exit
+    try:
+        start = time.perf_counter()
+        loaded = await asyncio.gather(*(load(i) for i in range(drafts)))
+        elapsed = time.perf_counter() - start
+    finally:
+        await robotevents_handler.close_session()
+    if results:
+        size = f"{len(loaded[0]['rankings'])} rankings, {len(loaded[0]['matches'])} matches"
+    else:
+        size = f"{len(loaded[0])} teams"
+    print(f"[STANDIN] Loaded {drafts} draft(s) of {size} in {elapsed * 1000:.1f}ms "
+          f"({'cold' if cold else 'cached'})")
+
+#runs the stand-in from the command line
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Robotevents API")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="serve the recorded fixtures")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--fixtures", default=FIXTURE_DIR)
+    serve_parser.add_argument("--latency-ms", type=float, default=0)
+    serve_parser.add_argument("--jitter-ms", type=float, default=0)
+    serve_parser.add_argument("--max-per-page", type=int, default=250, help="lower this to force more pages")
+    serve_parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that get a 503")
+    serve_parser.add_argument("--burst-every", type=int, default=0, help="start a burst of 429s every N requests")
+    serve_parser.add_argument("--burst-length", type=int, default=0, help="how many 429s are in each burst")
+    serve_parser.add_argument("--retry-after", type=int, default=1)
+    serve_parser.add_argument("--synthetic-teams", type=int, nargs="*", default=[],
+                              help="also serve made up events with these team counts")
+    record_parser = commands.add_parser("record", help="record a live event into a fixture")
+    record_parser.add_argument("sku")
+    record_parser.add_argument("--fixtures", default=FIXTURE_DIR)
+    bench_parser = commands.add_parser("bench", help="time team or results loading against a running stand-in")
+    bench_parser.add_argument("--base-url", default="http://127.0.0.1:8765/api/v2")
+    bench_parser.add_argument("--sku", default="RE-STANDIN-00-0001")
+    bench_parser.add_argument("--drafts", type=int, default=1)
+    bench_parser.add_argument("--cold", action="store_true", help="skip the cache for every load")
+    bench_parser.add_argument("--results", action="store_true", help="load the event results instead of the teams")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        fixtures = load_fixtures(args.fixtures)
+        for i, count in enumerate(args.synthetic_teams):
+            fixture = synthetic_fixture(count, 900000 + i)
+            fixtures[fixture["event"]["sku"]] = fixture
+        server = StandinServer(fixtures, args.latency_ms, args.jitter_ms, args.max_per_page, args.error_rate,
+                               args.burst_every, args.burst_length, args.retry_after)
+        print(f"[STANDIN] Serving {len(fixtures)} event(s): {', '.join(fixtures)}")
+        try:
+            web.run_app(server.make_app(), host=args.host, port=args.port, print=None)
+        finally:
+            print(f"[STANDIN] Served {server.request_count} request(s): {server.status_counts}")
+    elif args.command == "record":
+        token = os.getenv("ROBOTEVENTS_TOKEN")
+        if not token:
+            from dotenv import load_dotenv
+            load_dotenv()
+            token = os.getenv("ROBOTEVENTS_TOKEN")
+        asyncio.run(record(args.sku, token, args.fixtures))
+    elif args.command == "bench":
+        asyncio.run(bench(args.base_url, args.sku, args.drafts, args.cold, args.results))
+
+if __name__ == "__main__":
+    main()
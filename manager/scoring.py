@@ -0,0 +1,157 @@
+"""
+File: manager/scoring.py
+Author: Jeremiah Nairn
+
+Description: Holds the scoring system that turns an events results into points for each team,
+and the points for each drafters picks into the final standings
+"""
+
+#import libraries
+import numpy as np
+
+#the columns of the team results matrix
+RANK, WINS, LOSSES, TIES, WP, AP, SP, SKILLS, FINISH, DIVISION = range(10)
+METRIC_COUNT = 10
+
+#how far a team made it after qualifications
+NOT_SELECTED, SELECTED, ROUND_OF_16, QUARTER_FINALS, SEMI_FINALS, FINALS, CHAMPION = range(7)
+#robotevents match round numbers -> how far a team made it by playing in that round
+#(practice and qualification matches dont count, any other elimination round just means the team was picked)
+PRACTICE_ROUND, QUALIFICATION_ROUND = 1, 2
+ELIMINATION_ROUNDS = {6: ROUND_OF_16, 3: QUARTER_FINALS, 4: SEMI_FINALS, 5: FINALS}
+FINALS_ROUND = 5
+
+#the point system
+RANK_POINTS = 20.0 #what first seed in a division gets, going down evenly to 0 for last seed in that division
+WIN_POINTS = 2.0
+TIE_POINTS = 1.0
+LOSS_POINTS = 0.0
+WP_POINTS = 1.0 #per win point (autonomous win points included)
+AP_POINTS = 0.1 #per autonomous point
+SP_POINTS = 5.0 #for the best strength of schedule, scaled down for everyone else
+SKILLS_POINTS = 10.0 #for the best combined skills score, scaled down for everyone else
+FINISH_POINTS = np.array([0.0, 4.0, 6.0, 8.0, 12.0, 16.0, 24.0]) #indexed by how far a team made it
+
+#helper function to get a teams number out of a robotevents record
+def team_number(record):
+    team = record.get("team") or {}
+    return team.get("name") or team.get("number")
+
+#function to turn the raw robotevents results into a dict of team number -> metrics
+def parse_results(raw):
+    results = {}
+    #helper function to get (or make) the metrics for a team
+    def entry(number):
+        if number not in results:
+            results[number] = {"rank": 0, "wins": 0, "losses": 0, "ties": 0, "wp": 0, "ap": 0, "sp": 0,
+                               "skills": 0, "finish": NOT_SELECTED, "division": 0}
+        return results[number]
+    for ranking in raw.get("rankings", []):
+        number = team_number(ranking)
+        if number is None:
+            continue
+        metrics = entry(number)
+        for field in ("rank", "wins", "losses", "ties", "wp", "ap", "sp"):
+            metrics[field] = ranking.get(field) or 0
+        #ranks only mean something inside of the division they came from
+        metrics["division"] = (ranking.get("division") or {}).get("id") or 0
+    #combined skills is the best driver run plus the best programming run (robotevents lists one of each per team)
+    for skills in raw.get("skills", []):
+        number = team_number(skills)
+        if number is None:
+            continue
+        entry(number)["skills"] += skills.get("score") or 0
+    #how far each team made it in eliminations
+    final_matches = {} #division id -> ((instance, matchnum), match) for the last finals match played in that division
+    for match in raw.get("matches", []):
+        if match.get("round") in (PRACTICE_ROUND, QUALIFICATION_ROUND):
+            continue
+        stage = ELIMINATION_ROUNDS.get(match.get("round"), SELECTED)
+        for alliance in match.get("alliances", []):
+            for member in alliance.get("teams", []):
+                number = team_number(member)
+                if number is not None:
+                    metrics = entry(number)
+                    metrics["finish"] = max(metrics["finish"], stage)
+        #every division has its own finals, the last one played in it decides its champion
+        if match.get("round") == FINALS_ROUND and match.get("scored", True):
+            division = (match.get("division") or {}).get("id")
+            order = (match.get("instance") or 0, match.get("matchnum") or 0)
+            if division not in final_matches or order > final_matches[division][0]:
+                final_matches[division] = (order, match)
+    #the alliance that won each divisions deciding finals match are its champions (a tie or a missing score crowns nobody)
+    for _, final_match in final_matches.values():
+        alliances = [alliance for alliance in final_match.get("alliances", []) if alliance.get("score") is not None]
+        if len(alliances) == 2 and alliances[0]["score"] != alliances[1]["score"]:
+            winner = max(alliances, key=lambda alliance: alliance["score"])
+            for member in winner.get("teams", []):
+                number = team_number(member)
+                if number is not None:
+                    entry(number)["finish"] = CHAMPION
+    return results
+
+#function to build the teams x metrics matrix (teams come back sorted so picks can be looked up with a binary search)
+def build_matrix(results):
+    numbers = np.array(sorted(results), dtype=str)
+    matrix = np.zeros((len(numbers), METRIC_COUNT))
+    for i, number in enumerate(numbers):
+        metrics = results[number]
+        matrix[i] = (metrics["rank"], metrics["wins"], metrics["losses"], metrics["ties"], metrics["wp"],
+                     metrics["ap"], metrics["sp"], metrics["skills"], metrics["finish"], metrics["division"])
+    return numbers, matrix
+
+#function to work out how many points every team scored (one value per row of the matrix)
+def team_points(matrix):
+    if len(matrix) == 0:
+        return np.zeros(0)
+    rank = matrix[:, RANK]
+    ranked = rank > 0
+    #how many ranked teams are in each teams division (each division has its own first seed)
+    _, division = np.unique(matrix[:, DIVISION], return_inverse=True)
+    division_size = np.bincount(division, weights=ranked)[division]
+    #first seed gets all of the rank points and last seed gets none (a division of one just gets them all)
+    spread = np.maximum(division_size - 1, 1)
+    rank_share = np.where(division_size > 1, np.clip(division_size - rank, 0, None) / spread, 1.0)
+    points = np.where(ranked, RANK_POINTS * rank_share, 0.0)
+    points += WIN_POINTS * matrix[:, WINS] + TIE_POINTS * matrix[:, TIES] + LOSS_POINTS * matrix[:, LOSSES]
+    points += WP_POINTS * matrix[:, WP] + AP_POINTS * matrix[:, AP]
+    #strength of schedule and skills are scaled against the best at the event
+    for column, scale in ((SP, SP_POINTS), (SKILLS, SKILLS_POINTS)):
+        best = matrix[:, column].max()
+        if best > 0:
+            points += scale * matrix[:, column] / best
+    points += FINISH_POINTS[matrix[:, FINISH].astype(int).clip(0, len(FINISH_POINTS) - 1)]
+    return points
+
+#function to score every drafters picks, returns the standings best to worst
+#each row is (place, drafter name, drafter id, total points, points for each round), drafters that tie share a place
+def score_picks(drafters, picks, results, rounds):
+    numbers, matrix = build_matrix(results)
+    points = team_points(matrix)
+    #drafters x rounds grid of picks ("" where nobody was picked)
+    grid = np.array([list(drafter_picks or [None] * rounds)[:rounds] for drafter_picks in picks],
+                    dtype=object).reshape(len(picks), rounds)
+    grid[np.equal(grid, None)] = ""
+    grid = grid.astype(str)
+    #look every pick up at once, anything that isnt a team at the event is worth nothing
+    if len(numbers):
+        index = np.searchsorted(numbers, grid).clip(0, len(numbers) - 1)
+        found = numbers[index] == grid
+        round_points = np.where(found, points[index], 0.0)
+    else:
+        round_points = np.zeros(grid.shape)
+    totals = round_points.sum(axis=1)
+    #best total first, ties share the higher place
+    order = np.argsort(-totals, kind="stable")
+    descending = -totals[order]
+    places = np.searchsorted(descending, descending, side="left") + 1
+    return tuple(
+        (int(place), drafters[i][1], drafters[i][0], float(totals[i]), tuple(float(p) for p in round_points[i]))
+        for place, i in zip(places, order)
+    )
+
+#function to score a draft, raw is what Robotevent.get_event_results returns
+def score_draft(draft_instance, raw):
+    drafters = [(player.id, player.name) for player in sorted(draft_instance.draft_data, key=lambda player: player.position)]
+    picks = [draft_instance.get_picks(player_id) for player_id, _ in drafters]
+    return score_picks(drafters, picks, parse_results(raw), draft_instance.round_limit)
@@ -0,0 +1,216 @@
+"""
+File: manager/storage.py
+Author: Jeremiah Nairn
+
+Description: Holds the storage layer that saves drafts (and their players, picks and teams) between restarts
+"""
+
+#imports
+import csv
+import json
+import os
+import sqlite3
+
+#where the drafts are saved
+STORAGE_PATH = "drafts.db"
+
+#columns that come from live discord objects, if the object couldnt be fetched the saved value is kept instead of wiped
+KEEP_IF_MISSING = ("guild_id", "announce_channel_id")
+
+#the columns of the drafts table, in order (name is the key)
+DRAFT_COLUMNS = (
+    "name", "guild_id", "people_limit", "round_limit", "announcement_id", "emoji", "announce_channel_id",
+    "channel_id", "sku", "seed", "current_position", "real_position", "total_participants", "max_picks",
+    "time_limit_min", "timer_warning", "downtime_start", "downtime_end", "started", "finished",
+)
+
+class SQLiteStorage:
+    #constructor
+    def __init__(self, path = STORAGE_PATH):
+        self.path = path
+        #ensure parent directory exists if a directory was provided
+        dirpath = os.path.dirname(path)
+        if dirpath and not os.path.exists(dirpath):
+            os.makedirs(dirpath, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        #write ahead logging so a crash mid-write cant take out the other drafts
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS drafts ("
+                "name TEXT PRIMARY KEY, guild_id INTEGER, people_limit INTEGER, round_limit INTEGER NOT NULL, "
+                "announcement_id INTEGER, emoji TEXT, announce_channel_id INTEGER, channel_id INTEGER, sku TEXT, "
+                "seed INTEGER, current_position INTEGER, real_position INTEGER, total_participants INTEGER, "
+                "max_picks INTEGER, time_limit_min INTEGER, timer_warning INTEGER, downtime_start INTEGER, "
+                "downtime_end INTEGER, started INTEGER, finished INTEGER)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS drafts_by_guild ON drafts (guild_id)")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS players ("
+                "draft TEXT NOT NULL REFERENCES drafts (name) ON DELETE CASCADE, id INTEGER NOT NULL, "
+                "user TEXT, name TEXT, position INTEGER, PRIMARY KEY (draft, id))"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS picks ("
+                "draft TEXT NOT NULL REFERENCES drafts (name) ON DELETE CASCADE, player_id INTEGER NOT NULL, "
+                "round INTEGER NOT NULL, team TEXT NOT NULL, PRIMARY KEY (draft, player_id, round))"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS teams ("
+                "draft TEXT NOT NULL REFERENCES drafts (name) ON DELETE CASCADE, team TEXT NOT NULL, "
+                "picks_remaining INTEGER, PRIMARY KEY (draft, team))"
+            )
+            #the scored results, one row per drafter in standings order (round points are a json list)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS standings ("
+                "draft TEXT NOT NULL REFERENCES drafts (name) ON DELETE CASCADE, row INTEGER NOT NULL, "
+                "place INTEGER, name TEXT, player_id INTEGER, total REAL, round_points TEXT, PRIMARY KEY (draft, row))"
+            )
+
+    #function to save a drafts details (one row, replaced in place)
+    def save_draft(self, draft_instance):
+        guild = getattr(draft_instance.channel, "guild", None) or getattr(draft_instance.announce_channel, "guild", None)
+        values = (
+            draft_instance.draft_name, getattr(guild, "id", None), draft_instance.people_limit, draft_instance.round_limit,
+            draft_instance.announcement_id, draft_instance.emoji,
+            getattr(draft_instance.announce_channel, "id", draft_instance.announce_channel), draft_instance.channel_id,
+            draft_instance.draft_sku, draft_instance.seed, draft_instance.current_position, draft_instance.real_position,
+            draft_instance.total_participants, draft_instance.max_picks, draft_instance.time_limit_min,
+            draft_instance.timer_warning, draft_instance.skip_downtime_start, draft_instance.skip_downtime_end,
+            int(draft_instance.started), int(draft_instance.finished),
+        )
+        #upsert so the child rows (which cascade on delete) are left alone
+        updates = ", ".join(
+            f"{column} = COALESCE(excluded.{column}, drafts.{column})" if column in KEEP_IF_MISSING else f"{column} = excluded.{column}"
+            for column in DRAFT_COLUMNS[1:]
+        )
+        with self.connection:
+            self.connection.execute(
+                f"INSERT INTO drafts ({', '.join(DRAFT_COLUMNS)}) VALUES ({', '.join('?' * len(DRAFT_COLUMNS))}) "
+                f"ON CONFLICT (name) DO UPDATE SET {updates}",
+                values
+            )
+
+    #function to save the drafters that joined a draft
+    def save_players(self, draft_name, players):
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO players (draft, id, user, name, position) VALUES (?, ?, ?, ?, ?)",
+                [(draft_name, player.id, player.user, player.name, player.position) for player in players]
+            )
+
+    #function to save everyones draft position (and the team counts that come with it)
+    def save_order(self, draft_instance):
+        name = draft_instance.draft_name
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE players SET position = ? WHERE draft = ? AND id = ?",
+                [(player.position, name, player.id) for player in draft_instance.draft_data]
+            )
+        self.save_teams(name, draft_instance.teams)
+        self.save_draft(draft_instance)
+
+    #function to save the whole team list of a draft
+    def save_teams(self, draft_name, teams):
+        with self.connection:
+            self.connection.execute("DELETE FROM teams WHERE draft = ?", (draft_name,))
+            self.connection.executemany(
+                "INSERT INTO teams (draft, team, picks_remaining) VALUES (?, ?, ?)",
+                [(draft_name, team.team, team.picks_remaining) for team in teams]
+            )
+
+    #function to save a single pick (and how many picks the team has left)
+    def save_pick(self, draft_name, player_id, round, team, picks_remaining):
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO picks (draft, player_id, round, team) VALUES (?, ?, ?, ?)",
+                (draft_name, player_id, round, team)
+            )
+            self.connection.execute(
+                "UPDATE teams SET picks_remaining = ? WHERE draft = ? AND team = ?",
+                (picks_remaining, draft_name, team)
+            )
+
+    #function to save a team that was added to a draft
+    def save_team(self, draft_name, team, picks_remaining):
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO teams (draft, team, picks_remaining) VALUES (?, ?, ?)",
+                (draft_name, team, picks_remaining)
+            )
+
+    #function to remove a team (and every pick of it) from a draft
+    def delete_team(self, draft_name, team):
+        with self.connection:
+            self.connection.execute("DELETE FROM teams WHERE draft = ? AND team = ?", (draft_name, team))
+            self.connection.execute("DELETE FROM picks WHERE draft = ? AND team = ?", (draft_name, team))
+
+    #function to save the scored results of a draft (replaces any from an earlier scoring)
+    def save_standings(self, draft_name, standings):
+        with self.connection:
+            self.connection.execute("DELETE FROM standings WHERE draft = ?", (draft_name,))
+            self.connection.executemany(
+                "INSERT INTO standings (draft, row, place, name, player_id, total, round_points) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(draft_name, row, place, name, player_id, total, json.dumps(list(round_points)))
+                 for row, (place, name, player_id, total, round_points) in enumerate(standings)]
+            )
+
+    #function to load every saved draft, returns a list of dicts with "players", "picks", "teams" and "standings" filled in
+    def load_drafts(self):
+        drafts = {row["name"]: dict(row) for row in self.connection.execute("SELECT * FROM drafts")}
+        for saved in drafts.values():
+            saved["players"] = []
+            saved["picks"] = []
+            saved["teams"] = []
+            saved["standings"] = []
+        #one pass over each child table, handed out to the drafts they belong to
+        for row in self.connection.execute("SELECT draft, id, user, name, position FROM players ORDER BY draft, position"):
+            drafts[row["draft"]]["players"].append((row["id"], row["user"], row["name"], row["position"]))
+        for row in self.connection.execute("SELECT draft, player_id, round, team FROM picks"):
+            drafts[row["draft"]]["picks"].append((row["player_id"], row["round"], row["team"]))
+        for row in self.connection.execute("SELECT draft, team, picks_remaining FROM teams ORDER BY draft, rowid"):
+            drafts[row["draft"]]["teams"].append((row["team"], row["picks_remaining"]))
+        for row in self.connection.execute("SELECT draft, place, name, player_id, total, round_points FROM standings ORDER BY draft, row"):
+            drafts[row["draft"]]["standings"].append((row["place"], row["name"], row["player_id"], row["total"],
+                                                      json.loads(row["round_points"])))
+        return list(drafts.values())
+
+    #function to bring the drafts over from the old drafts.csv save file (only runs once)
+    def migrate_csv(self, path = "drafts.csv"):
+        if not os.path.exists(path):
+            return 0
+        #helper function that turns "" into None
+        def value_check(value):
+            return None if value == "" else value
+        count = 0
+        with open(path, "r", newline="", encoding="utf-8") as draft_savefile:
+            with self.connection:
+                for row in csv.reader(draft_savefile):
+                    if not row:
+                        continue
+                    self.connection.execute(
+                        "INSERT OR IGNORE INTO drafts (name, people_limit, round_limit, announcement_id, emoji, "
+                        "announce_channel_id, sku, seed, current_position, real_position, total_participants, "
+                        "time_limit_min, timer_warning, downtime_start, downtime_end, started, finished) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0, 0, 0, 0, 0, 0, 0, 0)",
+                        (row[0], value_check(row[1]), int(row[2]), value_check(row[3]), value_check(row[4]),
+                         value_check(row[5]), value_check(row[6]), value_check(row[7]), value_check(row[8]))
+                    )
+                    count += 1
+        #keep the old file around, but out of the way
+        os.replace(path, path + ".migrated")
+        print(f"[STORAGE] Migrated {count} Draft(s) from {path}.")
+        return count
+
+#the storage shared by the whole bot (opened the first time its needed, so importing this doesnt touch the disk)
+_storage = None
+
+#function to get the shared storage, opening it if it isnt open yet
+def get_storage():
+    global _storage
+    if _storage is None:
+        _storage = SQLiteStorage()
+    return _storage
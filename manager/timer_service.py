@@ -0,0 +1,95 @@
+"""
+File: manager/timer_service.py
+Author: Jeremiah Nairn
+
+Description: Holds the shared timer service that fires the turn warnings and skip deadlines for every draft
+"""
+
+#imports
+import asyncio
+import heapq
+import itertools
+import time
+
+#once this many cancelled timers are sitting in the heap, it gets cleaned out
+COMPACT_THRESHOLD = 1024
+
+#class for a single pending deadline
+class Timer:
+    __slots__ = ("when", "callback", "args", "cancelled")
+
+    #constructor
+    def __init__(self, when, callback, args):
+        self.when = when #wall clock time (time.time()) the timer should fire at
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+class TimerService:
+    #constructor
+    def __init__(self):
+        self.heap = [] #heap of (when, order, timer)
+        self.order = itertools.count()
+        self.cancelled_count = 0
+        self.handle = None #the one event loop callback waiting on the earliest deadline
+        self.armed_for = None #the deadline self.handle is set for
+
+    #function to run a callback at a given wall clock time, returns the timer so it can be cancelled
+    def schedule(self, when, callback, *args):
+        timer = Timer(when, callback, args)
+        heapq.heappush(self.heap, (when, next(self.order), timer))
+        #only the earliest deadline needs an event loop callback
+        if self.armed_for is None or when < self.armed_for:
+            self.arm()
+        return timer
+
+    #function to cancel a timer (it is dropped from the heap lazily)
+    def cancel(self, timer):
+        if timer is None or timer.cancelled:
+            return
+        timer.cancelled = True
+        self.cancelled_count += 1
+        #clean out the heap if it is mostly dead timers
+        if self.cancelled_count > COMPACT_THRESHOLD and self.cancelled_count > len(self.heap) // 2:
+            self.heap = [entry for entry in self.heap if not entry[2].cancelled]
+            heapq.heapify(self.heap)
+            self.cancelled_count = 0
+
+    #function to point the event loop callback at the earliest live deadline
+    def arm(self):
+        #drop cancelled timers off the top
+        while self.heap and self.heap[0][2].cancelled:
+            heapq.heappop(self.heap)
+            self.cancelled_count -= 1
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+            self.armed_for = None
+        if not self.heap:
+            return
+        self.armed_for = self.heap[0][0]
+        self.handle = asyncio.get_running_loop().call_later(max(0, self.armed_for - time.time()), self.fire)
+
+    #function that runs every timer that is due, then waits for the next one
+    def fire(self):
+        self.handle = None
+        self.armed_for = None
+        now = time.time()
+        while self.heap and self.heap[0][0] <= now:
+            timer = heapq.heappop(self.heap)[2]
+            if timer.cancelled:
+                self.cancelled_count -= 1
+                continue
+            timer.cancelled = True
+            try:
+                timer.callback(*timer.args)
+            except Exception as e:
+                print(f"[TIMERS] Timer Callback Failed: {e!r}")
+        self.arm()
+
+    #function to get how many timers are waiting to fire
+    def pending(self):
+        return len(self.heap) - self.cancelled_count
+
+#the timer service shared by every draft
+timers = TimerService()
@@ -0,0 +1,5 @@
+#lets the tests import bot and the manager package without installing anything
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,43 @@
+#tests for manager/event_cache.py
+import time
+
+from manager.event_cache import EventCache, conditional_headers
+
+def test_entries_round_trip_and_survive_a_reopen(tmp_path):
+    path = str(tmp_path / "cache" / "robotevents_cache.db")
+    cache = EventCache(path)
+    cache.put("teams", 51000, ["1A", "2B"], etag='"abc"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    cache.connection.close()
+    entry = EventCache(path).get("teams", "51000")
+    assert entry["value"] == ["1A", "2B"]
+    assert entry["etag"] == '"abc"'
+    assert EventCache(path).get("teams", 1) is None
+
+def test_entries_go_stale_after_the_ttl():
+    cache = EventCache(":memory:", ttl=60)
+    cache.put("event", "RE-1", 51000)
+    entry = cache.get("event", "RE-1")
+    assert cache.is_fresh(entry)
+    assert not cache.is_fresh(None)
+    entry["fetched_at"] -= 61
+    assert not cache.is_fresh(entry)
+
+def test_touch_restarts_the_ttl():
+    cache = EventCache(":memory:", ttl=60)
+    cache.put("event", "RE-1", 51000)
+    cache.connection.execute("UPDATE entries SET fetched_at = ?", (time.time() - 120,))
+    assert not cache.is_fresh(cache.get("event", "RE-1"))
+    cache.touch("event", "RE-1")
+    assert cache.is_fresh(cache.get("event", "RE-1"))
+
+def test_invalidate_drops_the_entry():
+    cache = EventCache(":memory:")
+    cache.put("event", "RE-1", 51000)
+    cache.invalidate("event", "RE-1")
+    assert cache.get("event", "RE-1") is None
+
+def test_conditional_headers():
+    assert conditional_headers(None) == {}
+    assert conditional_headers({"etag": None, "last_modified": None}) == {}
+    assert conditional_headers({"etag": '"abc"', "last_modified": "yesterday"}) == {
+        "If-None-Match": '"abc"', "If-Modified-Since": "yesterday"}
@@ -0,0 +1,109 @@
+#tests for manager/journal.py and how a draft is rebuilt from its rows, snapshot and journal
+import pytest
+
+from manager import storage
+from manager.draft import Draft
+from manager.journal import DraftJournal, SNAPSHOT_FORMAT
+
+#every test gets its own folder, so drafts.db and journals/ never land in the repo
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(storage, "_storage", None)
+    yield tmp_path
+    if storage._storage is not None:
+        storage._storage.connection.close()
+
+STANDINGS = ((1, "Ann", 1, 40.5, (30.0, 10.5)), (2, "Bob", 2, 12.0, (12.0, 0.0)))
+
+#helper function that makes a draft with two drafters, an order and one pick
+def make_draft(name = "test draft"):
+    draft = Draft(name, 2, 4, "RE-TEST-00-0001", None)
+    draft.teams = draft.generate_team_data(["1A", "2A", "3A", "4A"])
+    draft.index_teams()
+    draft.save_draft()
+    draft.generate_player_data([{"id": 1, "name": "ann", "nick": "Ann"}, {"id": 2, "name": "bob", "nick": "Bob"}])
+    draft.set_draft_order()
+    draft.pick_one(1, "1A")
+    draft.process_pick(0, 1)
+    draft.pick_multiple(2, ["1A", "3A"])
+    draft.advance_to(1, 1)
+    return draft
+
+#helper function that loads a draft back the way the bot does on startup
+def reload(name = "test draft"):
+    saved = next(saved for saved in storage.get_storage().load_drafts() if saved["name"] == name)
+    draft = Draft(name, saved["round_limit"], saved["people_limit"], saved["sku"], None)
+    draft.restore(saved)
+    draft.load_snapshot()
+    draft.replay_journal()
+    return draft
+
+def test_journal_round_trip():
+    journal = DraftJournal("round trip")
+    journal.append("pick", {"player": 1, "round": 1, "team": "1A"})
+    journal.append("finish", {})
+    events = journal.read()
+    assert [event["kind"] for event in events] == ["pick", "finish"]
+    assert events[0]["team"] == "1A"
+    journal.close()
+
+def test_damaged_tail_is_ignored():
+    journal = DraftJournal("torn")
+    journal.append("pick", {"player": 1, "round": 1, "team": "1A"})
+    journal.close()
+    with open(journal.path, "a", encoding="utf-8") as journal_file:
+        journal_file.write('{"kind":"pi')
+    assert [event["kind"] for event in journal.read()] == ["pick"]
+
+def test_snapshot_clears_the_journal():
+    journal = DraftJournal("snapshot")
+    journal.append("pick", {"player": 1, "round": 1, "team": "1A"})
+    journal.write_snapshot((SNAPSHOT_FORMAT, "state"))
+    assert journal.read() == []
+    assert journal.read_snapshot() == (SNAPSHOT_FORMAT, "state")
+    #later events go in a fresh journal next to the snapshot
+    journal.append("finish", {})
+    assert [event["kind"] for event in journal.read()] == ["finish"]
+    journal.close()
+
+def test_damaged_snapshot_is_ignored():
+    journal = DraftJournal("damaged")
+    journal.write_snapshot((SNAPSHOT_FORMAT, "state"))
+    with open(journal.snapshot_path, "wb") as snapshot_file:
+        snapshot_file.write(b"not a snapshot")
+    assert journal.read_snapshot() is None
+
+def test_draft_comes_back_from_rows_and_journal():
+    draft = make_draft()
+    draft.journal.close()
+    restored = reload()
+    assert restored.get_picks(1) == draft.get_picks(1) == ["1A", None]
+    assert list(restored.get_player(2).queue) == ["1A", "3A"]
+    assert restored.teams_by_number["1A"].picks_remaining == draft.teams_by_number["1A"].picks_remaining
+    assert (restored.real_position, restored.current_position) == (1, 1)
+    #replaying folds everything into a snapshot, so the next restart has nothing to replay
+    assert restored.journal.read() == []
+
+def test_draft_comes_back_from_snapshot_and_journal():
+    draft = make_draft()
+    draft.set_standings(STANDINGS)
+    draft.checkpoint()
+    #this one only lives in the journal (queues are never written to the rows)
+    draft.pick_multiple(1, ["2A"])
+    draft.journal.close()
+    restored = reload()
+    assert restored.standings == STANDINGS
+    assert list(restored.get_player(1).queue) == ["2A"]
+    assert list(restored.get_player(2).queue) == ["1A", "3A"]
+
+def test_snapshot_in_another_format_is_ignored():
+    draft = make_draft()
+    draft.journal.write_snapshot((SNAPSHOT_FORMAT - 1, (), (), ()))
+    draft.journal.close()
+    restored = Draft("test draft", 2, 4, "RE-TEST-00-0001", None)
+    assert restored.load_snapshot() is False
+    #the rows still have the picks
+    saved = storage.get_storage().load_drafts()[0]
+    restored.restore(saved)
+    assert restored.get_picks(1) == ["1A", None]
@@ -0,0 +1,90 @@
+#tests for manager/outbox.py
+import asyncio
+
+import pytest
+
+from manager import outbox as outbox_module
+from manager.outbox import Outbox, MAX_MESSAGE_LENGTH
+
+#a channel that remembers what was sent to it
+class FakeChannel:
+    def __init__(self, id = 1, fail_first = 0):
+        self.id = id
+        self.name = f"channel {id}"
+        self.sent = []
+        self.fail_first = fail_first
+    async def send(self, text):
+        if self.fail_first:
+            self.fail_first -= 1
+            raise RuntimeError("discord is down")
+        self.sent.append(text)
+
+#a short rate limit period so the tests dont wait around
+@pytest.fixture(autouse=True)
+def quick(monkeypatch):
+    monkeypatch.setattr(outbox_module, "CHANNEL_RATE_PERIOD_SECONDS", 0.1)
+
+def test_a_burst_goes_out_as_one_message():
+    channel = FakeChannel()
+    async def test():
+        outbox = Outbox(window=0.01)
+        for i in range(5):
+            outbox.send(channel, f"pick {i}")
+        await outbox.drain(channel)
+    asyncio.run(test())
+    assert channel.sent == ["\n".join(f"pick {i}" for i in range(5))]
+
+def test_long_bursts_are_split_at_the_message_limit():
+    channel = FakeChannel()
+    line = "x" * 600
+    async def test():
+        outbox = Outbox(window=0.01)
+        for _ in range(7):
+            outbox.send(channel, line)
+        await outbox.drain(channel)
+    asyncio.run(test())
+    assert all(len(message) <= MAX_MESSAGE_LENGTH for message in channel.sent)
+    assert "\n".join(channel.sent).split("\n") == [line] * 7
+    assert len(channel.sent) == 3
+
+def test_channels_are_queued_separately():
+    first, second = FakeChannel(1), FakeChannel(2)
+    async def test():
+        outbox = Outbox(window=0.01)
+        outbox.send(first, "a")
+        outbox.send(second, "b")
+        outbox.send(first, "c")
+        await asyncio.gather(outbox.drain(first), outbox.drain(second))
+    asyncio.run(test())
+    assert first.sent == ["a\nc"]
+    assert second.sent == ["b"]
+
+def test_rate_limit_holds_extra_messages(monkeypatch):
+    monkeypatch.setattr(outbox_module, "CHANNEL_RATE_LIMIT", 2)
+    monkeypatch.setattr(outbox_module, "MAX_MESSAGE_LENGTH", 1)
+    channel = FakeChannel()
+    async def test():
+        loop = asyncio.get_running_loop()
+        outbox = Outbox(window=0.01)
+        start = loop.time()
+        for text in "abc":
+            outbox.send(channel, text)
+        await outbox.drain(channel)
+        return loop.time() - start
+    elapsed = asyncio.run(test())
+    assert channel.sent == ["a", "b", "c"]
+    #the third message had to wait for the first one to leave the rate limit period
+    assert elapsed >= 0.1
+
+def test_failed_send_doesnt_stop_the_queue(monkeypatch):
+    monkeypatch.setattr(outbox_module, "MAX_MESSAGE_LENGTH", 1)
+    channel = FakeChannel(fail_first=1)
+    async def test():
+        outbox = Outbox(window=0.01)
+        outbox.send(channel, "a")
+        outbox.send(channel, "b")
+        await outbox.drain(channel)
+        outbox.forget(channel)
+        return outbox.channels
+    assert asyncio.run(test()) == {}
+    assert channel.sent == ["b"]
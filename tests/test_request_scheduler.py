@@ -0,0 +1,110 @@
+#tests for manager/request_scheduler.py, run against a made up session (no network)
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+from manager import request_scheduler
+from manager.request_scheduler import (RequestScheduler, RobotEventsError, parse_retry_after,
+                                       PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND)
+
+#a response that works as "async with session.request(...) as response"
+class FakeResponse:
+    def __init__(self, status, headers = None, body = None):
+        self.status = status
+        self.headers = headers or {}
+        self.body = body
+    async def __aenter__(self):
+        return self
+    async def __aexit__(self, *exc):
+        return False
+    async def json(self, content_type = None):
+        return self.body
+
+#a session that hands back the given responses in order (an exception in the list gets raised instead)
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.urls = []
+        self.times = []
+    def request(self, method, url, **kwargs):
+        self.urls.append(url)
+        self.times.append(time.monotonic())
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+#keeps the retry sleeps short
+@pytest.fixture(autouse=True)
+def quick_backoff(monkeypatch):
+    monkeypatch.setattr(request_scheduler.random, "uniform", lambda low, high: 0.01)
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+def test_ok_request_returns_the_json():
+    session = FakeSession([FakeResponse(200, {"ETag": "x"}, {"data": [1]})])
+    status, headers, data = asyncio.run(RequestScheduler().request(session, "GET", "/a"))
+    assert (status, headers["ETag"], data) == (200, "x", {"data": [1]})
+
+def test_not_modified_has_no_body():
+    session = FakeSession([FakeResponse(304, body={"ignored": True})])
+    assert asyncio.run(RequestScheduler().request(session, "GET", "/a"))[2] is None
+
+def test_server_errors_and_dropped_connections_are_retried():
+    session = FakeSession([FakeResponse(503), aiohttp.ClientConnectionError("reset"), FakeResponse(200, body={"ok": 1})])
+    assert asyncio.run(RequestScheduler().request(session, "GET", "/a"))[2] == {"ok": 1}
+    assert len(session.urls) == 3
+
+def test_gives_up_after_the_last_retry():
+    session = FakeSession([FakeResponse(500)] * 3)
+    with pytest.raises(RobotEventsError):
+        asyncio.run(RequestScheduler(max_retries=2).request(session, "GET", "/a"))
+    assert len(session.urls) == 3
+
+def test_client_errors_are_not_retried():
+    session = FakeSession([FakeResponse(404)])
+    with pytest.raises(RobotEventsError):
+        asyncio.run(RequestScheduler().request(session, "GET", "/a"))
+    assert len(session.urls) == 1
+
+def test_429_holds_every_request_for_retry_after():
+    session = FakeSession([FakeResponse(429, {"Retry-After": "0.2"}), FakeResponse(200, body={}), FakeResponse(200, body={})])
+    scheduler = RequestScheduler()
+    async def run():
+        first = asyncio.ensure_future(scheduler.request(session, "GET", "/throttled"))
+        #let the 429 come back before the second request asks for a token
+        await asyncio.sleep(0.05)
+        await asyncio.gather(first, scheduler.request(session, "GET", "/other"))
+    asyncio.run(run())
+    assert sorted(session.urls) == ["/other", "/throttled", "/throttled"]
+    #neither the retry nor the other request went out until the pause was over
+    assert min(session.times[1:]) - session.times[0] >= 0.15
+
+def test_interactive_requests_jump_the_background_queue():
+    session = FakeSession([FakeResponse(200, body={})] * 5)
+    #everything is queued before the first token is handed out
+    scheduler = RequestScheduler(rate=50, burst=1)
+    async def run():
+        requests = [scheduler.request(session, "GET", f"/background{i}", priority=PRIORITY_BACKGROUND) for i in range(4)]
+        requests.append(scheduler.request(session, "GET", "/interactive", priority=PRIORITY_INTERACTIVE))
+        await asyncio.gather(*requests)
+    asyncio.run(run())
+    assert session.urls[0] == "/interactive"
+    assert session.urls[1:] == [f"/background{i}" for i in range(4)]
+
+def test_token_bucket_limits_the_rate():
+    session = FakeSession([FakeResponse(200, body={})] * 6)
+    scheduler = RequestScheduler(rate=20, burst=2)
+    async def run():
+        await asyncio.gather(*(scheduler.request(session, "GET", f"/{i}") for i in range(6)))
+    start = time.monotonic()
+    asyncio.run(run())
+    #two go out in the burst, the other four wait about 1/20s each
+    assert time.monotonic() - start >= 0.15
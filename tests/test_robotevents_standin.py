@@ -0,0 +1,86 @@
+#tests for manager/robotevents_standin.py, run against the real client through a local server
+import asyncio
+
+import pytest
+
+from manager import robotevents_handler, robotevents_standin, scoring
+from manager.event_cache import EventCache, set_cache
+from manager.request_scheduler import RequestScheduler, RobotEventsError
+from aiohttp import web
+
+#point the client at a fresh cache and a scheduler that doesnt hold anything back
+@pytest.fixture(autouse=True)
+def client(monkeypatch):
+    monkeypatch.setattr(robotevents_handler, "scheduler", RequestScheduler(rate=1000, burst=1000, base_backoff=0.01))
+    set_cache(EventCache(":memory:"))
+    yield
+    set_cache(None)
+
+#helper function that serves the fixtures while the given coroutine function runs
+async def with_server(server, run):
+    runner = web.AppRunner(server.make_app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    try:
+        return await run(f"http://127.0.0.1:{port}/api/v2")
+    finally:
+        await robotevents_handler.close_session()
+        await runner.cleanup()
+
+def test_synthetic_results_have_a_champion_per_division():
+    fixture = robotevents_standin.synthetic_fixture(130)
+    assert len(fixture["event"]["divisions"]) == 3
+    results = scoring.parse_results(fixture)
+    champions = [number for number, metrics in results.items() if metrics["finish"] == scoring.CHAMPION]
+    assert len(champions) == 6
+    #the made up results never change for the same event
+    assert robotevents_standin.synthetic_fixture(130) == fixture
+
+def test_results_are_paginated_and_survive_429s(monkeypatch):
+    fixture = robotevents_standin.synthetic_fixture(130)
+    server = robotevents_standin.StandinServer({fixture["event"]["sku"]: fixture}, max_per_page=7,
+                                               burst_every=10, burst_length=1, retry_after=0)
+    async def run(base_url):
+        monkeypatch.setattr(robotevents_handler, "BASE_URL", base_url)
+        api = robotevents_handler.Robotevent("test", fixture["event"]["sku"], "token")
+        return await api.get_teams_from_event(), await api.get_event_results()
+    teams, results = asyncio.run(with_server(server, run))
+    assert len(teams) == 130
+    assert len(results["rankings"]) == len(fixture["rankings"])
+    assert len(results["matches"]) == len(fixture["matches"])
+    assert len(results["skills"]) == len(fixture["skills"])
+    assert server.status_counts[429] > 0
+    assert scoring.parse_results(results) == scoring.parse_results(fixture)
+
+def test_stale_teams_are_revalidated_with_their_etag(monkeypatch):
+    fixture = robotevents_standin.synthetic_fixture(30)
+    server = robotevents_standin.StandinServer({fixture["event"]["sku"]: fixture})
+    cache = EventCache(":memory:", ttl=0)
+    set_cache(cache)
+    async def run(base_url):
+        monkeypatch.setattr(robotevents_handler, "BASE_URL", base_url)
+        first = await robotevents_handler.Robotevent("test", fixture["event"]["sku"], "token").get_teams_from_event()
+        second = await robotevents_handler.Robotevent("test", fixture["event"]["sku"], "token").get_teams_from_event()
+        return first, second
+    first, second = asyncio.run(with_server(server, run))
+    assert first == second
+    #the second lookup only asked whether the event and the first team page changed
+    assert server.status_counts == {200: 2, 304: 2}
+
+def test_unknown_event_is_a_404():
+    server = robotevents_standin.StandinServer({})
+    async def run(base_url):
+        with pytest.raises(RobotEventsError):
+            await robotevents_handler.scheduler.request(robotevents_handler.get_session(), "GET", f"{base_url}/events/1/skills")
+    asyncio.run(with_server(server, run))
+    assert server.status_counts == {404: 1}
+
+def test_bench_closes_the_session_when_it_fails():
+    server = robotevents_standin.StandinServer({})
+    async def run(base_url):
+        with pytest.raises(RobotEventsError):
+            await robotevents_standin.bench(base_url, "RE-NOPE", 2, cold=True)
+        assert robotevents_handler._session is None
+    asyncio.run(with_server(server, run))
@@ -0,0 +1,96 @@
+#tests for manager/scoring.py
+import json
+import os
+
+import pytest
+
+from manager import scoring
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+#event with two divisions, each with its own finals (the matches come back out of order)
+@pytest.fixture
+def two_divisions():
+    with open(os.path.join(FIXTURES, "results_two_divisions.json")) as file:
+        return json.load(file)
+
+def test_each_division_crowns_its_own_champion(two_divisions):
+    results = scoring.parse_results(two_divisions)
+    #division 1 finals were won by blue
+    assert results["2A"]["finish"] == scoring.CHAMPION
+    assert results["1A"]["finish"] == scoring.FINALS
+    #division 2 finals went to a third match, red won that one
+    assert results["5B"]["finish"] == scoring.CHAMPION
+    assert results["6B"]["finish"] == scoring.FINALS
+    assert results["7B"]["finish"] == scoring.SEMI_FINALS
+    assert results["3A"]["finish"] == scoring.QUARTER_FINALS
+    assert results["4A"]["finish"] == scoring.NOT_SELECTED
+
+def test_tied_or_unscored_finals_crowns_nobody(two_divisions):
+    for match in two_divisions["matches"]:
+        if match["division"]["id"] == 1 and match["round"] == scoring.FINALS_ROUND:
+            match["alliances"][0]["score"] = match["alliances"][1]["score"]
+        if match["division"]["id"] == 2 and match["round"] == scoring.FINALS_ROUND and match["instance"] == 3:
+            match["alliances"][0]["score"] = None
+    results = scoring.parse_results(two_divisions)
+    assert not [number for number, metrics in results.items() if metrics["finish"] == scoring.CHAMPION]
+    assert results["1A"]["finish"] == results["2A"]["finish"] == scoring.FINALS
+
+def test_unscored_finals_match_does_not_decide(two_divisions):
+    for match in two_divisions["matches"]:
+        if match["division"]["id"] == 2 and match["round"] == scoring.FINALS_ROUND and match["instance"] == 3:
+            match["scored"] = False
+    results = scoring.parse_results(two_divisions)
+    #the second finals match is the last one that counts, red won it too
+    assert results["5B"]["finish"] == scoring.CHAMPION
+    assert results["6B"]["finish"] == scoring.FINALS
+
+def test_skills_add_driver_and_programming(two_divisions):
+    results = scoring.parse_results(two_divisions)
+    assert results["1A"]["skills"] == 50
+    assert results["5B"]["skills"] == 40
+    assert results["2A"]["skills"] == 0
+
+def test_rank_points_are_per_division(two_divisions):
+    numbers, matrix = scoring.build_matrix(scoring.parse_results(two_divisions))
+    #only look at the rank points
+    matrix[:, [scoring.WINS, scoring.TIES, scoring.WP, scoring.AP, scoring.SP, scoring.SKILLS, scoring.FINISH]] = 0
+    points = dict(zip(numbers, scoring.team_points(matrix)))
+    #both first seeds get everything and both last seeds get nothing
+    assert points["1A"] == points["5B"] == scoring.RANK_POINTS
+    assert points["4A"] == points["8B"] == 0.0
+    assert points["2A"] == points["6B"] == pytest.approx(scoring.RANK_POINTS * 2 / 3)
+
+def test_lone_team_in_a_division_gets_all_rank_points():
+    results = {"1A": {"rank": 1, "wins": 0, "losses": 0, "ties": 0, "wp": 0, "ap": 0, "sp": 0,
+                      "skills": 0, "finish": scoring.NOT_SELECTED, "division": 3}}
+    _, matrix = scoring.build_matrix(results)
+    assert scoring.team_points(matrix).tolist() == [scoring.RANK_POINTS]
+
+def test_ties_share_the_higher_place(two_divisions):
+    results = scoring.parse_results(two_divisions)
+    drafters = [(10, "ann"), (11, "bob"), (12, "cat"), (13, "dan")]
+    #ann and cat picked the same teams, dan picked nothing at the event
+    picks = [["1A", "6B"], ["5B", "2A"], ["6B", "1A"], ["99Z", None]]
+    standings = scoring.score_picks(drafters, picks, results, 2)
+    places = {name: place for place, name, _, _, _ in standings}
+    totals = {name: total for _, name, _, total, _ in standings}
+    assert totals["ann"] == totals["cat"]
+    assert places["ann"] == places["cat"]
+    assert places["dan"] == 4
+    assert totals["dan"] == 0.0
+    assert [place for place, *_ in standings] == sorted(place for place, *_ in standings)
+    #first place always has the best total
+    assert standings[0][3] == max(totals.values())
+
+def test_round_points_match_the_total(two_divisions):
+    results = scoring.parse_results(two_divisions)
+    standings = scoring.score_picks([(1, "ann")], [["1A", "2A", None]], results, 3)
+    (place, name, player_id, total, round_points), = standings
+    assert (place, name, player_id) == (1, "ann", 1)
+    assert len(round_points) == 3 and round_points[2] == 0.0
+    assert total == pytest.approx(sum(round_points))
+
+def test_no_results_scores_nothing():
+    standings = scoring.score_picks([(1, "ann"), (2, "bob")], [["1A"], []], {}, 1)
+    assert [(place, total) for place, _, _, total, _ in standings] == [(1, 0.0), (1, 0.0)]
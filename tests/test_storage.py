@@ -0,0 +1,74 @@
+#tests for manager/storage.py
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from manager.records import Player, Team
+from manager.storage import SQLiteStorage
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "data" / "drafts.db"))
+    yield storage
+    storage.connection.close()
+
+#helper function that makes something that looks enough like a Draft for the storage layer
+def fake_draft(name = "test draft", channel = None, announce_channel = None, players = (), teams = ()):
+    return SimpleNamespace(
+        draft_name=name, channel=channel, announce_channel=announce_channel, people_limit=8, round_limit=2,
+        announcement_id=None, emoji=None, channel_id=None, draft_sku="RE-TEST-00-0001", seed=5, current_position=0,
+        real_position=0, total_participants=len(players), max_picks=2, time_limit_min=0, timer_warning=0,
+        skip_downtime_start=0, skip_downtime_end=0, started=False, finished=False,
+        draft_data=list(players), teams=list(teams))
+
+def test_draft_and_its_rows_load_back(storage):
+    ann, bob = Player(1, "ann", "Ann", 2, 0), Player(2, "bob", "Bob", 2, 1)
+    draft = fake_draft(players=[ann, bob], teams=[Team("1A", 2), Team("2A", 2)])
+    storage.save_draft(draft)
+    storage.save_players("test draft", [ann, bob])
+    storage.save_order(draft)
+    storage.save_pick("test draft", 1, 1, "1A", 1)
+    storage.save_team("test draft", "3A", 2)
+    storage.delete_team("test draft", "2A")
+    storage.save_standings("test draft", [(1, "Ann", 1, 20.0, (20.0, 0.0))])
+    saved, = storage.load_drafts()
+    assert saved["sku"] == "RE-TEST-00-0001"
+    assert saved["players"] == [(1, "ann", "Ann", 0), (2, "bob", "Bob", 1)]
+    assert saved["picks"] == [(1, 1, "1A")]
+    assert saved["teams"] == [("1A", 1), ("3A", 2)]
+    assert saved["standings"] == [(1, "Ann", 1, 20.0, [20.0, 0.0])]
+
+def test_removing_a_team_removes_its_picks(storage):
+    storage.save_draft(fake_draft())
+    storage.save_team("test draft", "1A", 2)
+    storage.save_pick("test draft", 1, 1, "1A", 1)
+    storage.delete_team("test draft", "1A")
+    saved, = storage.load_drafts()
+    assert saved["picks"] == [] and saved["teams"] == []
+
+def test_channels_that_couldnt_be_fetched_keep_their_saved_ids(storage):
+    announce = SimpleNamespace(id=99, guild=SimpleNamespace(id=7))
+    storage.save_draft(fake_draft(announce_channel=announce))
+    #after a restart the channel couldnt be fetched, so neither it nor its guild are known
+    storage.save_draft(fake_draft())
+    saved, = storage.load_drafts()
+    assert (saved["guild_id"], saved["announce_channel_id"]) == (7, 99)
+    #a raw id is saved as it is
+    storage.save_draft(fake_draft(announce_channel=100))
+    assert storage.load_drafts()[0]["announce_channel_id"] == 100
+
+def test_old_csv_is_migrated_once(storage, tmp_path):
+    path = str(tmp_path / "drafts.csv")
+    with open(path, "w", encoding="utf-8") as draft_savefile:
+        draft_savefile.write("spring draft,8,3,,,,RE-VRC-00-0001,42,0\n\nfall draft,,4,123,:tada:,456,RE-VRC-00-0002,7,2\n")
+    assert storage.migrate_csv(path) == 2
+    #the old file is moved out of the way so it isnt migrated again
+    assert not os.path.exists(path) and os.path.exists(path + ".migrated")
+    assert storage.migrate_csv(path) == 0
+    saved = {draft["name"]: draft for draft in storage.load_drafts()}
+    assert saved["spring draft"]["round_limit"] == 3
+    assert saved["spring draft"]["announcement_id"] is None
+    assert saved["fall draft"]["people_limit"] is None
+    assert saved["fall draft"]["emoji"] == ":tada:"
+    assert saved["fall draft"]["sku"] == "RE-VRC-00-0002"
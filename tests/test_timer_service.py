@@ -0,0 +1,71 @@
+#tests for manager/timer_service.py
+import asyncio
+import time
+
+from manager import timer_service
+from manager.timer_service import TimerService
+
+#helper function that runs a coroutine function with a fresh timer service
+def run(test):
+    return asyncio.run(test(TimerService()))
+
+def test_timers_fire_in_deadline_order():
+    fired = []
+    async def test(timers):
+        now = time.time()
+        timers.schedule(now + 0.06, fired.append, "late")
+        timers.schedule(now + 0.02, fired.append, "early")
+        timers.schedule(now - 5, fired.append, "overdue")
+        await asyncio.sleep(0.1)
+        return timers.pending()
+    assert run(test) == 0
+    assert fired == ["overdue", "early", "late"]
+
+def test_earlier_timer_rearms_the_callback():
+    fired = []
+    async def test(timers):
+        timers.schedule(time.time() + 10, fired.append, "later")
+        timers.schedule(time.time() + 0.02, fired.append, "soon")
+        await asyncio.sleep(0.05)
+        return timers.armed_for
+    armed_for = run(test)
+    assert fired == ["soon"]
+    #the service is waiting on the one that is left
+    assert armed_for is not None and armed_for > time.time()
+
+def test_cancelled_timer_never_fires():
+    fired = []
+    async def test(timers):
+        timer = timers.schedule(time.time() + 0.02, fired.append, "cancelled")
+        timers.schedule(time.time() + 0.03, fired.append, "kept")
+        timers.cancel(timer)
+        #cancelling twice (or cancelling nothing) is harmless
+        timers.cancel(timer)
+        timers.cancel(None)
+        assert timers.pending() == 1
+        await asyncio.sleep(0.06)
+    run(test)
+    assert fired == ["kept"]
+
+def test_failing_callback_doesnt_stop_the_rest():
+    fired = []
+    def broken():
+        raise ValueError("boom")
+    async def test(timers):
+        now = time.time()
+        timers.schedule(now + 0.01, broken)
+        timers.schedule(now + 0.01, fired.append, "after")
+        await asyncio.sleep(0.04)
+    run(test)
+    assert fired == ["after"]
+
+def test_heap_is_compacted_when_mostly_cancelled(monkeypatch):
+    monkeypatch.setattr(timer_service, "COMPACT_THRESHOLD", 4)
+    async def test(timers):
+        live = timers.schedule(time.time() + 60, print)
+        for timer in [timers.schedule(time.time() + 30, print) for _ in range(10)]:
+            timers.cancel(timer)
+        assert len(timers.heap) < 11
+        assert timers.pending() == 1
+        timers.cancel(live)
+    run(test)